@@ -20,6 +20,7 @@ from __future__ import division
 from __future__ import print_function
 
 import argparse
+import logging
 import sys
 import numpy as np
 import shutil
@@ -46,6 +47,10 @@ def transpose_shape(shape, dst_order):
 
 
 def convert(conf, output):
+    # show the transform progress on stdout unless the caller configured
+    # logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        stream=sys.stdout)
     for model_name, model_conf in conf["models"].items():
         model_output = output + "/" + model_name + "/model"
         org_model_dir = output + "/" + model_name + "/org_model"
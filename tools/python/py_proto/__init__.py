@@ -20,6 +20,23 @@ import os
 from utils import device
 from utils.util import MaceLogger
 
+
+def _find_module(name):
+    try:
+        import importlib.util
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+# Parsing large caffe/mace models with the pure python protobuf is slow,
+# prefer the C++ implementation when it is installed. This must be done
+# before any protobuf message module is imported.
+if 'PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION' not in os.environ \
+        and not _find_module('google._upb._message') \
+        and _find_module('google.protobuf.pyext._message'):
+    os.environ['PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION'] = 'cpp'
+
 cwd = os.path.dirname(__file__)
 
 # TODO: Remove bazel deps
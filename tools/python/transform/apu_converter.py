@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import copy
+import logging
 import numpy as np
 from enum import Enum
 from operator import mul
@@ -30,6 +31,7 @@ from transform.base_converter import DataFormat
 from transform.base_converter import FrameworkType
 from utils.util import mace_check
 
+logger = logging.getLogger(__name__)
 
 ApuSupportedOps = [
     'Concat',
@@ -134,7 +136,7 @@ class ApuConverter(base_converter.ConverterInterface):
                            ' with NHWC format')
 
     def convert_ops(self):
-        print("Convert mace graph to apu.")
+        logger.info("Convert mace graph to apu.")
         for op in self._model.op:
             if not self._apu_ops.has_op(op.type):
                 raise Exception('Unsupported op: ', op)
@@ -226,7 +228,8 @@ class ApuConverter(base_converter.ConverterInterface):
 
         for op in self._model.op:
             if len(op.output_type) >= 1:
-                print([op.name, len(op.output), len(op.output_type)])
+                logger.info("%s", [op.name, len(op.output),
+                                   len(op.output_type)])
                 type_map[op.output[0]] = op.output_type[0]
                 continue
             mace_check(op.input[0] in type_map,
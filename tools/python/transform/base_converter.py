@@ -318,6 +318,7 @@ class TransformerRule(Enum):
     FP16_MATMUL_WEIGHT = 41
     FP16_GATHER_WEIGHT = 42
     QUANTIZE_LARGE_WEIGHTS = 43
+    FOLD_FC_AND_BN = 44
 
 
 class ConverterInterface(object):
@@ -537,6 +538,7 @@ class ConverterOption(object):
                 TransformerRule.FOLD_CONV_AND_BN,
                 TransformerRule.FOLD_DECONV_AND_BN,
                 TransformerRule.FOLD_DEPTHWISE_CONV_AND_BN,
+                TransformerRule.FOLD_FC_AND_BN,
                 TransformerRule.TRANSFORM_ADD_TO_BIASADD,
                 TransformerRule.REARRANGE_BATCH_TO_SPACE,
                 TransformerRule.FOLD_BIASADD,
@@ -13,7 +13,8 @@
 # limitations under the License.
 
 
-import math
+import collections
+import logging
 
 import numpy as np
 import six
@@ -34,6 +35,8 @@ from utils.util import mace_check
 
 from py_proto import caffe_pb2
 
+logger = logging.getLogger(__name__)
+
 caffe_group_str = 'group'
 caffe_kernel_h_str = 'kernel_h'
 caffe_kernel_w_str = 'kernel_w'
@@ -43,10 +46,32 @@ caffe_pad_h_str = 'pad_h'
 caffe_pad_w_str = 'pad_w'
 
 
+class LazyBlobList(object):
+    """LazyBlobList holds caffe blob protos and converts each one to numpy
+    ndarray only when it is first accessed, so weights of layers which are
+    never converted are not decoded at all."""
+
+    def __init__(self, blobs):
+        self._blobs = list(blobs)
+        self._arrays = [None] * len(self._blobs)
+
+    def __len__(self):
+        return len(self._blobs)
+
+    def __getitem__(self, index):
+        if self._arrays[index] is None:
+            self._arrays[index] = CaffeOperator.blob_to_nparray(
+                self._blobs[index])
+        return self._arrays[index]
+
+    def __setitem__(self, index, value):
+        self._arrays[index] = value
+
+
 class CaffeOperator(object):
     """CaffeOperator merges and provides both layer and weights information.
     Layer records caffe layer proto, while blobs records the weight data in
-    format of numpy ndarray.
+    format of numpy ndarray, which is decoded lazily.
     """
 
     def __init__(self):
@@ -75,7 +100,7 @@ class CaffeOperator(object):
 
     @blobs.setter
     def blobs(self, blobs):
-        self._blobs = [self.blob_to_nparray(blob) for blob in blobs]
+        self._blobs = LazyBlobList(blobs)
 
     def get_blob(self, index):
         mace_check(index < len(self._blobs), "blob out of index")
@@ -83,12 +108,14 @@ class CaffeOperator(object):
 
     @staticmethod
     def blob_to_nparray(blob):
+        # fill a preallocated buffer in one pass, np.asarray would first
+        # inspect every element of the protobuf container to infer a shape
+        data = np.fromiter(blob.data, dtype=np.float32, count=len(blob.data))
         if blob.num != 0:
-            return (np.asarray(blob.data, dtype=np.float32).reshape(
-                (blob.num, blob.channels, blob.height, blob.width)))
+            return data.reshape(
+                (blob.num, blob.channels, blob.height, blob.width))
         else:
-            return np.asarray(blob.data, dtype=np.float32).reshape(
-                blob.shape.dim)
+            return data.reshape(blob.shape.dim)
 
 
 class CaffeNet(object):
@@ -98,7 +125,7 @@ class CaffeNet(object):
 
     def __init__(self):
         self._ops = {}
-        self._consumers = {}
+        self._consumers = collections.defaultdict(list)
         # for in-place op, its input name is the same with output name,
         # so we change the output name to an alias
         self._alias_op_output_name = {}
@@ -120,25 +147,26 @@ class CaffeNet(object):
         self._ops[layer.name] = op
 
         # change op output name if it is an in-place op
-        layer.bottom[:] = [self._alias_op_output_name.get(layer_input,
-                                                          layer_input) for
-                           layer_input in layer.bottom][:]
-        for i in six.moves.range(len(layer.top)):
-            old_name = layer.top[i]
-            if layer.type == 'Input':
+        bottom = [self._alias_op_output_name.get(layer_input, layer_input)
+                  for layer_input in layer.bottom]
+        layer.bottom[:] = bottom
+        is_input = layer.type == 'Input'
+        top = []
+        for old_name in layer.top:
+            if is_input:
                 new_name = old_name
             else:
                 idx = 0
-                new_name = old_name + '#' + str(idx)
+                name_prefix = old_name + '#'
+                new_name = name_prefix + '0'
                 while new_name in self._used_op_output_name:
                     idx += 1
-                    new_name = old_name + '#' + str(idx)
-            layer.top[i] = new_name
+                    new_name = name_prefix + str(idx)
+            top.append(new_name)
             self._alias_op_output_name[old_name] = new_name
-            self._used_op_output_name.update([new_name])
-        for input_tensor in layer.bottom:
-            if input_tensor not in self._consumers:
-                self._consumers[input_tensor] = []
+            self._used_op_output_name.add(new_name)
+        layer.top[:] = top
+        for input_tensor in bottom:
             self._consumers[input_tensor].append(op)
 
     def add_blob(self, weight):
@@ -206,20 +234,22 @@ class CaffeConverter(base_converter.ConverterInterface):
 
         # parse prototxt
         with open(src_model_file, 'r') as f:
-            google.protobuf.text_format.Merge(
-                str(f.read()), self._caffe_layers)
-            self.filter_test_layers(self._caffe_layers)
-            for layer in self._caffe_layers.layer:
-                self._caffe_net.add_layer(layer)
+            google.protobuf.text_format.Merge(f.read(), self._caffe_layers)
+        self.filter_test_layers(self._caffe_layers)
 
         # parse model weight
         with open(src_weight_file, 'rb') as f:
             caffe_weights.ParseFromString(f.read())
-            self.filter_test_layers(caffe_weights)
-            for weight in caffe_weights.layer:
-                self._caffe_net.add_blob(weight)
+        self.filter_test_layers(caffe_weights)
+        weights = {weight.name: weight for weight in caffe_weights.layer}
 
-        self._skip_ops = []
+        for layer in self._caffe_layers.layer:
+            self._caffe_net.add_layer(layer)
+            if layer.name in weights:
+                self._caffe_net.add_blob(weights[layer.name])
+
+        self._skip_ops = set()
+        self._general_op_template = self.general_op_template()
 
     def run(self):
         self.convert_ops()
@@ -251,12 +281,13 @@ class CaffeConverter(base_converter.ConverterInterface):
         visited = set()
         for op in ops:
             for i in six.moves.range(len(op.output)):
-                original_output_name = op.output[i].split('#')[0]
+                output_name = op.output[i]
+                original_output_name = output_name.split('#')[0]
                 if original_output_name not in visited and\
                         original_output_name not in self._option.input_nodes:
                     self.replace_input_name(
-                        consumers.get(op.output[i], []),
-                        op.output[i],
+                        consumers.get(output_name, []),
+                        output_name,
                         original_output_name)
                     op.output[i] = original_output_name
                     visited.update([original_output_name])
@@ -274,39 +305,39 @@ class CaffeConverter(base_converter.ConverterInterface):
     @staticmethod
     def filter_test_layers(layers):
         phase_map = {0: 'train', 1: 'test'}
-        while True:
-            changed = False
-            for layer in layers.layer:
-                phase = 'test'
-                if len(layer.include):
-                    phase = phase_map[layer.include[0].phase]
-                if len(layer.exclude):
-                    phase = phase_map[layer.exclude[0].phase]
-                if phase != 'test' or layer.type == 'Dropout':
-                    print("Remove layer %s (%s)" % (layer.name, layer.type))
-                    layers.layer.remove(layer)
-                    changed = True
-                    break
-            if not changed:
-                break
+        removed = []
+        for i, layer in enumerate(layers.layer):
+            phase = 'test'
+            if len(layer.include):
+                phase = phase_map[layer.include[0].phase]
+            if len(layer.exclude):
+                phase = phase_map[layer.exclude[0].phase]
+            if phase != 'test' or layer.type == 'Dropout':
+                logger.info("Remove layer %s (%s)", layer.name, layer.type)
+                removed.append(i)
+        for i in reversed(removed):
+            del layers.layer[i]
 
     @staticmethod
     def add_stride_pad_kernel_arg(param, op_def):
+        param_stride = param.stride
+        param_pad = param.pad
+        param_kernel_size = param.kernel_size
         try:
-            if len(param.stride) > 1 or len(param.kernel_size) > 1 or len(
-                    param.pad) > 1:
+            if len(param_stride) > 1 or len(param_kernel_size) > 1 or len(
+                    param_pad) > 1:
                 raise Exception(
                     'Mace does not support multiple stride/kernel_size/pad')
-            stride = [param.stride[0],
-                      param.stride[0]] if len(param.stride) else [1, 1]
-            pad = [param.pad[0] * 2,
-                   param.pad[0] * 2] if len(param.pad) else [0, 0]
-            kernel = [param.kernel_size[0], param.kernel_size[0]] if len(
-                param.kernel_size) else [0, 0]
+            stride = [param_stride[0],
+                      param_stride[0]] if len(param_stride) else [1, 1]
+            pad = [param_pad[0] * 2,
+                   param_pad[0] * 2] if len(param_pad) else [0, 0]
+            kernel = [param_kernel_size[0], param_kernel_size[0]] if len(
+                param_kernel_size) else [0, 0]
         except TypeError:
-            stride = [param.stride, param.stride]
-            pad = [param.pad * 2, param.pad * 2]
-            kernel = [param.kernel_size, param.kernel_size]
+            stride = [param_stride, param_stride]
+            pad = [param_pad * 2, param_pad * 2]
+            kernel = [param_kernel_size, param_kernel_size]
 
         if param.HasField(caffe_stride_h_str) or param.HasField(
                 caffe_stride_w_str):
@@ -314,24 +345,30 @@ class CaffeConverter(base_converter.ConverterInterface):
         if param.HasField(caffe_pad_h_str) or param.HasField(caffe_pad_w_str):
             pad = [param.pad_h * 2, param.pad_w * 2]
 
-        strides_arg = op_def.arg.add()
-        strides_arg.name = MaceKeyword.mace_strides_str
-        strides_arg.ints.extend(stride)
-        padding_arg = op_def.arg.add()
-        padding_arg.name = MaceKeyword.mace_padding_values_str
-        padding_arg.ints.extend(pad)
+        op_def.arg.add(name=MaceKeyword.mace_strides_str, ints=stride)
+        op_def.arg.add(name=MaceKeyword.mace_padding_values_str, ints=pad)
 
         if op_def.type == MaceOp.Pooling.name:
             if param.HasField(caffe_kernel_h_str) or param.HasField(
                     caffe_kernel_w_str):
                 kernel = [param.kernel_h, param.kernel_w]
-            kernels_arg = op_def.arg.add()
-            kernels_arg.name = MaceKeyword.mace_kernel_str
-            kernels_arg.ints.extend(kernel)
+            op_def.arg.add(name=MaceKeyword.mace_kernel_str, ints=kernel)
             if param.HasField('global_pooling'):
-                global_pooling_arg = op_def.arg.add()
-                global_pooling_arg.name = MaceKeyword.mace_global_pooling_str
-                global_pooling_arg.i = 1
+                op_def.arg.add(name=MaceKeyword.mace_global_pooling_str, i=1)
+
+    @staticmethod
+    def add_dilation_arg(param, op_def):
+        # dilation is specific for convolution in caffe
+        dilations = [1, 1]
+        param_dilation = param.dilation
+        if len(param_dilation) > 0:
+            if len(param_dilation) == 1:
+                dilations = [param_dilation[0], param_dilation[0]]
+            elif len(param_dilation) == 2:
+                dilations = [param_dilation[0], param_dilation[1]]
+            op_def.arg.add(name=MaceKeyword.mace_dilations_str,
+                           ints=dilations)
+        return dilations
 
     def convert_ops(self):
         layer_names = set()
@@ -341,55 +378,64 @@ class CaffeConverter(base_converter.ConverterInterface):
                 mace_check(layer.name not in layer_names,
                            "There is duplicate layer name '%s' in your model"
                            % layer.name)
-                mace_check(layer.type in self._op_converters,
+                op_converter = self._op_converters.get(layer.type, None)
+                mace_check(op_converter is not None,
                            "Mace does not support caffe op type %s yet"
                            % layer.type)
                 layer_names.add(layer.name)
-                self._op_converters[layer.type](caffe_op)
+                op_converter(caffe_op)
 
     def add_tensor(self, name, shape, data_type, value):
         tensor = self._mace_net_def.tensors.add()
         tensor.name = name
         tensor.dims.extend(list(shape))
         tensor.data_type = data_type
-        tensor.float_data.extend(value.flat)
+        # tolist converts the whole array in one C loop, iterating value.flat
+        # boxes every element through the interpreter
+        value = np.ascontiguousarray(value, dtype=np.float32)
+        tensor.float_data.extend(value.ravel().tolist())
 
     def convert_nop(self, layer):
         pass
 
-    def convert_general_op(self, caffe_op):
-        op = self._mace_net_def.op.add()
-        op.name = caffe_op.name
-        op.type = caffe_op.type
-        op.input.extend(caffe_op.layer.bottom)
-        op.output.extend(caffe_op.layer.top)
-
-        data_type_arg = op.arg.add()
-        data_type_arg.name = 'T'
-        data_type_arg.i = self._option.data_type
+    def general_op_template(self):
+        """Serialized op def with the arguments shared by every op"""
+        op = mace_pb2.OperatorDef()
 
-        framework_type_arg = op.arg.add()
-        framework_type_arg.name = MaceKeyword.mace_framework_type_str
-        framework_type_arg.i = FrameworkType.CAFFE.value
+        op.arg.add(name='T', i=self._option.data_type)
+        op.arg.add(name=MaceKeyword.mace_framework_type_str,
+                   i=FrameworkType.CAFFE.value)
 
         ConverterUtil.add_data_format_arg(op, DataFormat.NCHW)
 
+        return op.SerializeToString()
+
+    def convert_general_op(self, caffe_op):
+        op = self._mace_net_def.op.add()
+        op.MergeFromString(self._general_op_template)
+        layer = caffe_op.layer
+        op.name = layer.name
+        op.type = layer.type
+        op.input.extend(layer.bottom)
+        op.output.extend(layer.top)
+
         return op
 
     def convert_conv2d(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         param = caffe_op.layer.convolution_param
+        blobs = caffe_op.blobs
         is_depthwise = False
         if param.HasField(caffe_group_str) and param.group > 1:
-            filter_data = caffe_op.blobs[0]
+            filter_data = blobs[0]
             mace_check(param.group == filter_data.shape[0] and
                        filter_data.shape[1] == 1,
                        "Mace do not support group convolution yet")
             is_depthwise = True
-            caffe_op.blobs[0] = filter_data.reshape(1,
-                                                    filter_data.shape[0],
-                                                    filter_data.shape[2],
-                                                    filter_data.shape[3])
+            blobs[0] = filter_data.reshape(1,
+                                           filter_data.shape[0],
+                                           filter_data.shape[2],
+                                           filter_data.shape[3])
 
         if is_depthwise:
             op.type = MaceOp.DepthwiseConv2d.name
@@ -397,29 +443,20 @@ class CaffeConverter(base_converter.ConverterInterface):
             op.type = MaceOp.Conv2D.name
 
         self.add_stride_pad_kernel_arg(param, op)
-        # dilation is specific for convolution in caffe
-        dilations = [1, 1]
-        if len(param.dilation) > 0:
-            dilation_arg = op.arg.add()
-            dilation_arg.name = MaceKeyword.mace_dilations_str
-            if len(param.dilation) == 1:
-                dilations = [param.dilation[0], param.dilation[0]]
-            elif len(param.dilation) == 2:
-                dilations = [param.dilation[0], param.dilation[1]]
-            dilation_arg.ints.extend(dilations)
+        self.add_dilation_arg(param, op)
 
         filter_tensor_name = op.name + '_filter'
-        filter_data = caffe_op.blobs[0]
+        filter_data = blobs[0]
         self.add_tensor(filter_tensor_name, filter_data.shape,
                         mace_pb2.DT_FLOAT, filter_data)
         op.input.extend([filter_tensor_name])
 
-        if len(caffe_op.blobs) == 2:
+        if len(blobs) == 2:
             bias_tensor_name = op.name + '_bias'
-            bias_data = caffe_op.blobs[1]
+            bias_data = blobs[1]
             # caffe of old version has 4-dimension bias, so reshape it
             # to single dimension
-            self.add_tensor(bias_tensor_name, bias_data.reshape(-1).shape,
+            self.add_tensor(bias_tensor_name, (bias_data.size,),
                             mace_pb2.DT_FLOAT,
                             bias_data)
             op.input.extend([bias_tensor_name])
@@ -427,41 +464,31 @@ class CaffeConverter(base_converter.ConverterInterface):
     def convert_deconv2d(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         param = caffe_op.layer.convolution_param
+        blobs = caffe_op.blobs
 
         if param.HasField(caffe_group_str) and param.group > 1:
-            group_arg = op.arg.add()
-            group_arg.name = MaceKeyword.mace_group_str
-            group_arg.i = param.group
+            op.arg.add(name=MaceKeyword.mace_group_str, i=param.group)
             op.type = MaceOp.DepthwiseDeconv2d.name
         else:
             op.type = MaceOp.Deconv2D.name
 
         self.add_stride_pad_kernel_arg(param, op)
-        # dilation is specific for convolution in caffe
-        dilations = [1, 1]
-        if len(param.dilation) > 0:
-            dilation_arg = op.arg.add()
-            dilation_arg.name = MaceKeyword.mace_dilations_str
-            if len(param.dilation) == 1:
-                dilations = [param.dilation[0], param.dilation[0]]
-            elif len(param.dilation) == 2:
-                dilations = [param.dilation[0], param.dilation[1]]
-            mace_check(dilations[0] == 1 and dilations[1] == 1,
-                       "Mace only supports dilation == 1 deconvolution.")
-            dilation_arg.ints.extend(dilations)
+        dilations = self.add_dilation_arg(param, op)
+        mace_check(dilations[0] == 1 and dilations[1] == 1,
+                   "Mace only supports dilation == 1 deconvolution.")
 
         filter_tensor_name = op.name + '_filter'
-        filter_data = caffe_op.blobs[0]
+        filter_data = blobs[0]
         self.add_tensor(filter_tensor_name, filter_data.shape,
                         mace_pb2.DT_FLOAT, filter_data)
         op.input.extend([filter_tensor_name])
 
-        if len(caffe_op.blobs) == 2:
+        if len(blobs) == 2:
             bias_tensor_name = op.name + '_bias'
-            bias_data = caffe_op.blobs[1]
+            bias_data = blobs[1]
             # caffe of old version has 4-dimension bias, so reshape it
             # to single dimension
-            self.add_tensor(bias_tensor_name, bias_data.reshape(-1).shape,
+            self.add_tensor(bias_tensor_name, (bias_data.size,),
                             mace_pb2.DT_FLOAT,
                             bias_data)
             op.input.extend([bias_tensor_name])
@@ -471,13 +498,10 @@ class CaffeConverter(base_converter.ConverterInterface):
         param = caffe_op.layer.eltwise_param
 
         op.type = MaceOp.Eltwise.name
-        type_arg = op.arg.add()
-        type_arg.name = MaceKeyword.mace_element_type_str
-        type_arg.i = self.eltwise_type[param.operation].value
+        op.arg.add(name=MaceKeyword.mace_element_type_str,
+                   i=self.eltwise_type[param.operation].value)
         if len(param.coeff) > 0:
-            coeff_arg = op.arg.add()
-            coeff_arg.name = 'coeff'
-            coeff_arg.floats.extend(list(param.coeff))
+            op.arg.add(name='coeff', floats=param.coeff)
 
     def convert_add(self, caffe_op):
         op = self.convert_general_op(caffe_op)
@@ -486,57 +510,64 @@ class CaffeConverter(base_converter.ConverterInterface):
     def convert_activation(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         op.type = MaceOp.Activation.name
+        layer = caffe_op.layer
+        layer_type = layer.type
 
-        type_arg = op.arg.add()
-        type_arg.name = MaceKeyword.mace_activation_type_str
-        type_arg.s = six.b(self.activation_type[caffe_op.type].name)
+        negative_slope = layer.relu_param.negative_slope
+        is_leakyrelu = layer_type == 'ReLU' and negative_slope != 0
+        if is_leakyrelu:
+            activation_type = ActivationType.LEAKYRELU
+        else:
+            activation_type = self.activation_type[layer_type]
+        op.arg.add(name=MaceKeyword.mace_activation_type_str,
+                   s=six.b(activation_type.name))
 
-        if caffe_op.type == 'PReLU':
-            alpha_tensor_name = caffe_op.name + '_alpha'
+        if layer_type == 'PReLU':
+            alpha_tensor_name = layer.name + '_alpha'
             alpha_data = caffe_op.blobs[0]
-            self.add_tensor(alpha_tensor_name, alpha_data.reshape(-1).shape,
+            self.add_tensor(alpha_tensor_name, (alpha_data.size,),
                             mace_pb2.DT_FLOAT, alpha_data)
             op.input.extend([alpha_tensor_name])
 
-        negative_slope = caffe_op.layer.relu_param.negative_slope
-        if caffe_op.type == 'ReLU' and negative_slope != 0:
-            param_arg = op.arg.add()
-            param_arg.name = MaceKeyword.mace_activation_leakyrelu_coefficient_str  # noqa
-            param_arg.f = caffe_op.layer.relu_param.negative_slope
-
-            type_arg.s = six.b(ActivationType.LEAKYRELU.name)
+        if is_leakyrelu:
+            op.arg.add(
+                name=MaceKeyword.mace_activation_leakyrelu_coefficient_str,
+                f=negative_slope)
 
     def convert_folded_batchnorm(self, caffe_op):
         op = self.convert_general_op(caffe_op)
+        layer = caffe_op.layer
+        blobs = caffe_op.blobs
         op.type = MaceOp.BatchNorm.name
 
         scale_op = None
-        for consumer in self._caffe_net.get_consumers(caffe_op.layer.top[0]):
+        for consumer in self._caffe_net.get_consumers(layer.top[0]):
             if consumer.type == 'Scale':
                 scale_op = consumer
         mace_check(scale_op is not None, "batchnorm is not followed by scale")
-        self._skip_ops.append(scale_op)
+        self._skip_ops.add(scale_op)
 
-        epsilon_value = caffe_op.layer.batch_norm_param.eps
-        mace_check(caffe_op.blobs[2][0] != 0, "batchnorm scalar is zero")
-        mean_value = (1. / caffe_op.blobs[2][0]) * caffe_op.blobs[0]
-        var_value = (1. / caffe_op.blobs[2][0]) * caffe_op.blobs[1]
+        epsilon_value = layer.batch_norm_param.eps
+        mace_check(blobs[2][0] != 0, "batchnorm scalar is zero")
+        moving_average_factor = 1. / blobs[2][0]
+        mean_value = moving_average_factor * blobs[0]
+        var_value = moving_average_factor * blobs[1]
         gamma_value = scale_op.blobs[0]
         beta_value = np.zeros_like(mean_value)
         if len(scale_op.blobs) == 2:
             beta_value = scale_op.blobs[1]
 
         scale_value = (
-                (1.0 / np.vectorize(math.sqrt)(var_value + epsilon_value)) *
+                (1.0 / np.sqrt(var_value + epsilon_value)) *
                 gamma_value).reshape(-1)
         offset_value = ((-mean_value * scale_value) + beta_value).reshape(-1)
 
         input_names = [op.name + '_scale', op.name + '_offset']
-        self.add_tensor(input_names[0], scale_value.reshape(-1).shape,
+        self.add_tensor(input_names[0], (scale_value.size,),
                         mace_pb2.DT_FLOAT, scale_value)
-        self.add_tensor(input_names[1], offset_value.reshape(-1).shape,
+        self.add_tensor(input_names[1], (offset_value.size,),
                         mace_pb2.DT_FLOAT, offset_value)
-        op.input.extend([name for name in input_names])
+        op.input.extend(input_names)
         op.output[:] = scale_op.layer.top[:]
 
     def convert_pooling(self, caffe_op):
@@ -545,9 +576,8 @@ class CaffeConverter(base_converter.ConverterInterface):
 
         op.type = MaceOp.Pooling.name
         self.add_stride_pad_kernel_arg(param, op)
-        pooling_type_arg = op.arg.add()
-        pooling_type_arg.name = MaceKeyword.mace_pooling_type_str
-        pooling_type_arg.i = self.pooling_type_mode[param.pool].value
+        op.arg.add(name=MaceKeyword.mace_pooling_type_str,
+                   i=self.pooling_type_mode[param.pool].value)
 
     def convert_softmax(self, caffe_op):
         self.convert_general_op(caffe_op)
@@ -571,37 +601,34 @@ class CaffeConverter(base_converter.ConverterInterface):
         else:
             offset_value[axis:] = param.offset
 
-        offset_arg = op.arg.add()
-        offset_arg.name = MaceKeyword.mace_offset_str
-        offset_arg.ints.extend(offset_value)
+        op.arg.add(name=MaceKeyword.mace_offset_str,
+                   ints=offset_value.tolist())
 
     def convert_concat(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         param = caffe_op.layer.concat_param
         op.type = MaceOp.Concat.name
 
-        axis_arg = op.arg.add()
-        axis_arg.name = MaceKeyword.mace_axis_str
-        axis_arg.i = 1
+        axis = 1
         if param.HasField(MaceKeyword.mace_axis_str):
-            axis_arg.i = param.axis
+            axis = param.axis
         elif param.HasField('concat_dim'):
-            axis_arg.i = param.concat_dim
+            axis = param.concat_dim
+        op.arg.add(name=MaceKeyword.mace_axis_str, i=axis)
 
     def convert_slice(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         op.type = MaceOp.Split.name
 
-        if caffe_op.layer.HasField('slice_param'):
-            param = caffe_op.layer.slice_param
+        layer = caffe_op.layer
+        if layer.HasField('slice_param'):
+            param = layer.slice_param
             mace_check(not param.HasField('axis') or param.axis == 1
                        or param.axis == -3,
                        "Mace do not support slice with axis %d" % param.axis)
             mace_check(len(param.slice_point) == 0,
                        "Mace do not support slice with slice_point")
-        axis_arg = op.arg.add()
-        axis_arg.name = MaceKeyword.mace_axis_str
-        axis_arg.i = 1
+        op.arg.add(name=MaceKeyword.mace_axis_str, i=1)
 
     def convert_interp(self, caffe_op):
         op = self.convert_general_op(caffe_op)
@@ -610,67 +637,64 @@ class CaffeConverter(base_converter.ConverterInterface):
                    'Only support bilinear interp with height and width')
         op.type = MaceOp.ResizeBilinear.name
 
-        size_arg = op.arg.add()
-        size_arg.name = MaceKeyword.mace_resize_size_str
-        size_value = np.array([param.height, param.width], dtype=np.int32)
-        size_arg.ints.extend(size_value)
+        op.arg.add(name=MaceKeyword.mace_resize_size_str,
+                   ints=[param.height, param.width])
         # interp op's `align_corners` param is always true in caffe
-        align_corners_arg = op.arg.add()
-        align_corners_arg.name = MaceKeyword.mace_align_corners_str
-        align_corners_arg.i = 1
+        op.arg.add(name=MaceKeyword.mace_align_corners_str, i=1)
 
     def convert_fully_connected(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         param = caffe_op.layer.inner_product_param
+        blobs = caffe_op.blobs
         op.type = MaceOp.FullyConnected.name
 
         mace_check((param.axis == 1 or param.axis == -3)
                    and not param.transpose,
                    "Do not support non-default axis and transpose")
-        mace_check(caffe_op.blobs[0].ndim in [2, 4],
+        mace_check(blobs[0].ndim in [2, 4],
                    "Unexpected fc weigth ndim.")
-        if caffe_op.blobs[0].ndim == 4:
-            mace_check(list(caffe_op.blobs[0].shape[:2]) == [1, 1],
+        if blobs[0].ndim == 4:
+            mace_check(list(blobs[0].shape[:2]) == [1, 1],
                        "Do not support 4D weight with shape [1, 1, *, *]")
 
         weight_tensor_name = op.name + '_weight'
-        weight_data = caffe_op.blobs[0].reshape(param.num_output, -1)
+        weight_data = blobs[0].reshape(param.num_output, -1)
         self.add_tensor(weight_tensor_name, weight_data.shape,
                         mace_pb2.DT_FLOAT,
                         weight_data)
         op.input.extend([weight_tensor_name])
 
-        if len(caffe_op.blobs) == 2:
+        if len(blobs) == 2:
             bias_tensor_name = op.name + '_bias'
-            bias_data = caffe_op.blobs[1]
-            self.add_tensor(bias_tensor_name, bias_data.reshape(-1).shape,
+            bias_data = blobs[1]
+            self.add_tensor(bias_tensor_name, (bias_data.size,),
                             mace_pb2.DT_FLOAT,
                             bias_data)
             op.input.extend([bias_tensor_name])
 
     def convert_scale(self, caffe_op):
         op = self.convert_general_op(caffe_op)
+        blobs = caffe_op.blobs
         op.type = MaceOp.Eltwise.name
 
         scale_op_name = op.name
         op.name = scale_op_name + '_prod'
 
-        type_arg = op.arg.add()
-        type_arg.name = MaceKeyword.mace_element_type_str
-        type_arg.i = EltwiseType.PROD.value
+        op.arg.add(name=MaceKeyword.mace_element_type_str,
+                   i=EltwiseType.PROD.value)
 
         scale_tensor_name = scale_op_name + '_scale'
-        scale_data = caffe_op.blobs[0]
+        scale_data = blobs[0]
         self.add_tensor(scale_tensor_name, scale_data.shape,
                         mace_pb2.DT_FLOAT, scale_data)
         op.input.extend([scale_tensor_name])
 
-        if len(caffe_op.blobs) == 2:
+        if len(blobs) == 2:
             bias_tensor_name = scale_op_name + '_offset'
-            bias_data = caffe_op.blobs[1]
+            bias_data = blobs[1]
             # caffe of old version has 4-dimension bias, so reshape it
             # to single dimension
-            self.add_tensor(bias_tensor_name, bias_data.reshape(-1).shape,
+            self.add_tensor(bias_tensor_name, (bias_data.size,),
                             mace_pb2.DT_FLOAT,
                             bias_data)
             op.input.extend([bias_tensor_name])
@@ -687,9 +711,7 @@ class CaffeConverter(base_converter.ConverterInterface):
 
             del op.input[2]
 
-            data_type_arg = biasadd_op.arg.add()
-            data_type_arg.name = 'T'
-            data_type_arg.i = self._option.data_type
+            biasadd_op.arg.add(name='T', i=self._option.data_type)
 
             ConverterUtil.add_data_format_arg(biasadd_op,
                                               DataFormat.NCHW)
@@ -699,38 +721,32 @@ class CaffeConverter(base_converter.ConverterInterface):
         param = caffe_op.layer.shuffle_channel_param
         op.type = MaceOp.ChannelShuffle.name
 
-        group_arg = op.arg.add()
-        group_arg.name = MaceKeyword.mace_group_str
-        group_arg.i = 1
+        group = 1
         if param.HasField('group'):
-            group_arg.i = param.group
+            group = param.group
+        op.arg.add(name=MaceKeyword.mace_group_str, i=group)
 
     def convert_permute(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         param = caffe_op.layer.permute_param
         op.type = MaceOp.Transpose.name
 
-        dims_arg = op.arg.add()
-        dims_arg.name = MaceKeyword.mace_dims_str
-        dims_arg.ints.extend(list(param.order))
+        op.arg.add(name=MaceKeyword.mace_dims_str, ints=param.order)
 
     def convert_flatten(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         param = caffe_op.layer.flatten_param
         op.type = MaceOp.Reshape.name
 
-        axis_arg = op.arg.add()
-        axis_arg.name = MaceKeyword.mace_axis_str
-        axis_arg.i = 1
+        axis = 1
         if param.HasField('axis'):
-            axis_arg.i = param.axis
-        axis_arg.i = 4 + axis_arg.i if axis_arg.i < 0 else axis_arg.i
-
-        end_axis_arg = op.arg.add()
-        end_axis_arg.name = MaceKeyword.mace_end_axis_str
-        end_axis_arg.i = -1
+            axis = param.axis
+        axis = 4 + axis if axis < 0 else axis
+        end_axis = -1
         if param.HasField('end_axis'):
-            end_axis_arg.i = param.end_axis
+            end_axis = param.end_axis
+        op.arg.add(name=MaceKeyword.mace_axis_str, i=axis)
+        op.arg.add(name=MaceKeyword.mace_end_axis_str, i=end_axis)
 
     def convert_prior_box(self, caffe_op):
         op = self.convert_general_op(caffe_op)
@@ -804,41 +820,33 @@ class CaffeConverter(base_converter.ConverterInterface):
         param = caffe_op.layer.reshape_param
         op.type = MaceOp.Reshape.name
 
-        dim_arg = op.arg.add()
-        dim_arg.name = MaceKeyword.mace_dim_str
-        dim_arg.ints.extend(list(param.shape.dim))
-
-        axis_arg = op.arg.add()
-        axis_arg.name = 'reshape_' + MaceKeyword.mace_axis_str
-        axis_arg.i = 0
+        axis = 0
         if param.HasField('axis'):
-            axis_arg.i = param.axis
-
-        num_axes_arg = op.arg.add()
-        num_axes_arg.name = MaceKeyword.mace_num_axes_str
-        num_axes_arg.i = -1
+            axis = param.axis
+        num_axes = -1
         if param.HasField('num_axes'):
-            num_axes_arg.i = param.num_axes
+            num_axes = param.num_axes
+        op.arg.add(name=MaceKeyword.mace_dim_str, ints=param.shape.dim)
+        op.arg.add(name='reshape_' + MaceKeyword.mace_axis_str, i=axis)
+        op.arg.add(name=MaceKeyword.mace_num_axes_str, i=num_axes)
 
     def convert_lpnorm(self, caffe_op):
         op = self.convert_general_op(caffe_op)
         param = caffe_op.layer.l2normalization_param
         op.type = MaceOp.LpNorm.name
 
-        axis_arg = op.arg.add()
-        axis_arg.name = MaceKeyword.mace_axis_str
-        axis_arg.i = -1
+        axis = -1
         if param.HasField('axis'):
-            axis_arg.i = param.axis
+            axis = param.axis
+        op.arg.add(name=MaceKeyword.mace_axis_str, i=axis)
 
-        p_arg = op.arg.add()
-        p_arg.name = MaceKeyword.mace_p_str
         if caffe_op.type == 'L1Normalization':
-            p_arg.i = 1
+            p = 1
         elif caffe_op.type == 'L2Normalization':
-            p_arg.i = 2
+            p = 2
         else:
             mace_check(False, "Can not support %s" % caffe_op.type)
+        op.arg.add(name=MaceKeyword.mace_p_str, i=p)
 
     def convert_MVN(self, caffe_op):
         op = self.convert_general_op(caffe_op)
@@ -846,19 +854,15 @@ class CaffeConverter(base_converter.ConverterInterface):
         op.type = MaceOp.MVNorm.name
 
         if param.HasField('normalize_variance'):
-            nv_arg = op.arg.add()
-            nv_arg.name = MaceKeyword.mace_nor_var_str
-            nv_arg.i = param.normalize_variance
+            op.arg.add(name=MaceKeyword.mace_nor_var_str,
+                       i=param.normalize_variance)
 
         if param.HasField('across_channels'):
-            across_ch_arg = op.arg.add()
-            across_ch_arg.name = MaceKeyword.mace_across_ch_str
-            across_ch_arg.i = param.across_channels
+            op.arg.add(name=MaceKeyword.mace_across_ch_str,
+                       i=param.across_channels)
 
         if param.HasField('eps'):
-            eps_arg = op.arg.add()
-            eps_arg.name = MaceKeyword.mace_epsilon_str
-            eps_arg.f = param.eps
+            op.arg.add(name=MaceKeyword.mace_epsilon_str, f=param.eps)
 
     def convert_Bias(self, caffe_op):
         op = self.convert_general_op(caffe_op)
@@ -866,10 +870,9 @@ class CaffeConverter(base_converter.ConverterInterface):
         param = caffe_op.layer.bias_param
         mace_check(not param.axis or param.axis == 0 or param.axis == 1,
                    "BiasAdd only support axis with 0 or 1.")
-        axis_arg = op.arg.add()
-        axis_arg.name = MaceKeyword.mace_axis_str
-        axis_arg.i = 1
+        axis = 1
         if param.axis is not None:
             mace_check(param.axis == 0 or param.axis == 1,
                        "BiasAdd only support axis with 0 or 1.")
-            axis_arg.i = param.axis
+            axis = param.axis
+        op.arg.add(name=MaceKeyword.mace_axis_str, i=axis)
@@ -18,6 +18,7 @@ from __future__ import print_function
 
 
 import copy
+import logging
 import numpy as np
 from enum import Enum
 from operator import mul
@@ -35,6 +36,7 @@ from transform.base_converter import PoolingType
 from transform.base_converter import ReduceType
 from utils.util import mace_check
 
+logger = logging.getLogger(__name__)
 
 HexagonSupportedOps = [
     'BatchToSpaceND_8',
@@ -289,7 +291,7 @@ class HexagonConverter(base_converter.ConverterInterface):
             node_id_counter += 1
             node_id_map[tensor.name] = tensor.node_id
 
-        print("Hexagon op:")
+        logger.info("Hexagon op:")
         index = 0
         for op in self._model.op:
             op.node_id = node_id_counter
@@ -302,8 +304,8 @@ class HexagonConverter(base_converter.ConverterInterface):
                 index += 1
             else:
                 index_str = ''
-            print('Op: %s (%s, node_id:%d, index:%s)' %
-                  (op.name, op.type, op.node_id, index_str))
+            logger.info('Op: %s (%s, node_id:%d, index:%s)',
+                        op.name, op.type, op.node_id, index_str)
             for ipt in op.input:
                 op_name, port = get_op_and_port_from_tensor(ipt)
                 tensor_name = ipt if port == 0 else op_name + ':0'
@@ -317,7 +319,7 @@ class HexagonConverter(base_converter.ConverterInterface):
                 node_input.output_port = port
 
     def convert_ops(self):
-        print("Convert mace graph to hexagon.")
+        logger.info("Convert mace graph to hexagon.")
         for op in self._model.op:
             mace_check(op.type in self._op_converters,
                        "Mace Hexagon does not support op type %s yet"
@@ -388,7 +390,7 @@ class HexagonConverter(base_converter.ConverterInterface):
     def convert_conv2d(self, op):
         channels = op.output_shape[0].dims[3]
         if len(op.input) < 3:
-            print('Supernode requires biasadd, we add it.')
+            logger.info('Supernode requires biasadd, we add it.')
             bias_data = np.zeros(channels, dtype=int)
             bias_tensor = self._model.tensors.add()
             bias_tensor.data_type = mace_pb2.DT_INT32
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 
+import logging
 import sys
 from enum import Enum
 import six
@@ -39,6 +40,8 @@ import onnx.utils
 from onnx import mapping, numpy_helper, TensorProto
 from numbers import Number
 
+logger = logging.getLogger(__name__)
+
 IS_PYTHON3 = sys.version_info > (3,)
 
 
@@ -253,14 +256,14 @@ class OnnxNode(object):
         self.node_proto = node
 
     def print_info(self):
-        print("node: ", self.name)
-        print("    type: ", self.op_type)
-        print("    domain: ", self.domain)
-        print("    inputs: ", self.inputs)
-        print("    outputs: ", self.outputs)
-        print("    attrs:")
+        logger.info("node: %s", self.name)
+        logger.info("    type: %s", self.op_type)
+        logger.info("    domain: %s", self.domain)
+        logger.info("    inputs: %s", self.inputs)
+        logger.info("    outputs: %s", self.outputs)
+        logger.info("    attrs:")
         for arg in self.attrs:
-            print("        %s: %s" % (arg, self.attrs[arg]))
+            logger.info("        %s: %s", arg, self.attrs[arg])
 
 
 class OnnxTensor(object):
@@ -411,11 +414,12 @@ class OnnxConverter(base_converter.ConverterInterface):
         self._isKaldi = False
 
         polish_available = True
-        print("onnx model IR version: ", ir_version)
+        logger.info("onnx model IR version: %s", ir_version)
         for imp in opset_imp:
             domain = imp.domain
             version = imp.version
-            print("constains ops domain: ", domain, "version:", version)
+            logger.info("constains ops domain: %s version: %s",
+                        domain, version)
             if 'kaldi' in domain:
                 polish_available = False
                 self._data_format = DataFormat.NONE
@@ -431,11 +435,11 @@ class OnnxConverter(base_converter.ConverterInterface):
     @staticmethod
     def print_graph_info(graph):
         for value_info in graph.value_info:
-            print("value info:", value_info)
+            logger.info("value info: %s", value_info)
         for value_info in graph.input:
-            print("inputs info:", value_info)
+            logger.info("inputs info: %s", value_info)
         for value_info in graph.output:
-            print("outputs info:", value_info)
+            logger.info("outputs info: %s", value_info)
 
     def extract_shape_info(self, graph):
         def extract_value_info(shape_dict, value_info):
@@ -458,9 +462,11 @@ class OnnxConverter(base_converter.ConverterInterface):
         tensor.data_type = data_type
 
         if tensor.data_type == mace_pb2.DT_INT32:
-            tensor.int32_data.extend(value.astype(np.int32).flat)
+            tensor.int32_data.extend(
+                np.ascontiguousarray(value, dtype=np.int32).ravel().tolist())
         elif tensor.data_type == mace_pb2.DT_FLOAT:
-            tensor.float_data.extend(value.astype(np.float32).flat)
+            tensor.float_data.extend(
+                np.ascontiguousarray(value, dtype=np.float32).ravel().tolist())
         else:
             mace_check(False, "Not supported tensor type: %s" % name)
 
@@ -608,20 +614,22 @@ class OnnxConverter(base_converter.ConverterInterface):
         op = self.convert_general_op(node)
         op.type = MaceOp.Activation.name
 
+        activation_type = self.activation_type[node.op_type]
         type_arg = op.arg.add()
         type_arg.name = MaceKeyword.mace_activation_type_str
-        type_arg.s = six.b(self.activation_type[node.op_type].name)
+        type_arg.s = six.b(activation_type.name)
 
-        if "alpha" in node.attrs:
-            alpha_value = node.attrs["alpha"]
-        else:
-            if node.op_type == OnnxOpType.LeakyRelu.name:
-                alpha_value = 0.01
+        # PRelu takes its slope as the second input, only LeakyRelu carries
+        # a scalar coefficient
+        if activation_type == ActivationType.LEAKYRELU:
+            if "alpha" in node.attrs:
+                alpha_value = node.attrs["alpha"]
             else:
-                alpha_value = 0
-        alpha_arg = op.arg.add()
-        alpha_arg.name = MaceKeyword.mace_activation_max_limit_str
-        alpha_arg.f = alpha_value
+                alpha_value = 0.01
+            alpha_arg = op.arg.add()
+            alpha_arg.name = \
+                MaceKeyword.mace_activation_leakyrelu_coefficient_str
+            alpha_arg.f = alpha_value
 
     def convert_affine(self, node):
         op = self.convert_general_op(node)
@@ -13,7 +13,10 @@
 # limitations under the License.
 
 
+import logging
 import math
+from functools import reduce
+from operator import mul
 
 import numpy as np
 import six
@@ -25,6 +28,8 @@ from transform.base_converter import MaceKeyword
 from transform.base_converter import ConverterUtil
 from utils.util import mace_check
 
+logger = logging.getLogger(__name__)
+
 
 class ShapeInference(object):
     """Currently we only use it to infer caffe shape, we use tensorflow engine
@@ -57,6 +62,8 @@ class ShapeInference(object):
         }
 
         self._net = net
+        # filter format is a property of the whole net, look it up once
+        self._filter_format = ConverterUtil.filter_format(net)
         self._output_shape_cache = {}
         for input_node in input_nodes:
             input_shape = input_node.shape[:]
@@ -94,24 +101,21 @@ class ShapeInference(object):
 
     def infer_shape_conv_pool_shape(self, op):
         input_shape = self._output_shape_cache[op.input[0]]
-        output_shape = np.zeros_like(input_shape)
+        output_shape = [0] * len(input_shape)
+        data_format = ConverterUtil.data_format(op)
         if op.type == MaceOp.Pooling:
             filter_shape = list(
                 ConverterUtil.get_arg(op, MaceKeyword.mace_kernel_str).ints)
-            if ConverterUtil.data_format(op) == DataFormat.NCHW:
+            global_pooling = ConverterUtil.get_arg(
+                op, MaceKeyword.mace_global_pooling_str) is not None
+            if data_format == DataFormat.NCHW:
                 filter_shape = [input_shape[1], input_shape[1]] + filter_shape
-                if ConverterUtil.get_arg(op,
-                                         MaceKeyword.mace_global_pooling_str) \
-                        is not None:
-                    filter_shape[2] = input_shape[2]
-                    filter_shape[3] = input_shape[3]
+                if global_pooling:
+                    filter_shape[2:4] = input_shape[2:4]
             else:  # NHWC
                 filter_shape = filter_shape + [input_shape[1], input_shape[1]]
-                if ConverterUtil.get_arg(op,
-                                         MaceKeyword.mace_global_pooling_str) \
-                        is not None:
-                    filter_shape[0] = input_shape[1]
-                    filter_shape[1] = input_shape[2]
+                if global_pooling:
+                    filter_shape[0:2] = input_shape[1:3]
         else:
             filter_shape = self._output_shape_cache[op.input[1]]
 
@@ -125,26 +129,26 @@ class ShapeInference(object):
         else:
             dilations = [1, 1]
         if op.type == MaceOp.Pooling:
-            round_func = math.ceil
+            round_func = np.ceil
         else:
-            round_func = math.floor
+            round_func = np.floor
 
         output_shape[0] = input_shape[0]
-        if ConverterUtil.data_format(op) == DataFormat.NCHW \
-                and ConverterUtil.filter_format(self._net) == DataFormat.OIHW:  # noqa
+        if data_format == DataFormat.NCHW \
+                and self._filter_format == DataFormat.OIHW:
             # filter format: OIHW
             if op.type == MaceOp.DepthwiseConv2d.name:
                 output_shape[1] = filter_shape[0] * filter_shape[1]
             else:
                 output_shape[1] = filter_shape[0]
-            output_shape[2] = int(
-                round_func((input_shape[2] + paddings[0] - filter_shape[2] -
-                            (filter_shape[2] - 1) *
-                            (dilations[0] - 1)) / float(strides[0]))) + 1
-            output_shape[3] = int(
-                round_func((input_shape[3] + paddings[1] - filter_shape[3] -
-                            (filter_shape[3] - 1) *
-                            (dilations[1] - 1)) / float(strides[1]))) + 1
+            # infer height and width together
+            input_hw = np.array(input_shape[2:4])
+            filter_hw = np.array(filter_shape[2:4])
+            output_hw = round_func(
+                (input_hw + np.array(paddings[:2]) - filter_hw -
+                 (filter_hw - 1) * (np.array(dilations[:2]) - 1)) /
+                np.array(strides[:2], dtype=np.float64)).astype(int) + 1
+            output_shape[2:4] = output_hw.tolist()
         else:
             mace_check(False,
                        "Mace can only infer shape for"
@@ -172,7 +176,7 @@ class ShapeInference(object):
                                           MaceKeyword.mace_group_str)
         output_shape[0] = input_shape[0]
         if ConverterUtil.data_format(op) == DataFormat.NCHW \
-                and ConverterUtil.filter_format(self._net) == DataFormat.OIHW:  # noqa
+                and self._filter_format == DataFormat.OIHW:
             # filter format: IOHW
             output_shape[1] = filter_shape[1]
             if group_arg is not None and group_arg.i > 1:
@@ -189,8 +193,8 @@ class ShapeInference(object):
             mace_check(False,
                        "Mace can only infer shape for"
                        " NCHW input and OIHW filter")
-        print("deconv layer %s (%s) input:%s filter:%s output:%s" %
-              (op.name, op.type, input_shape, filter_shape, output_shape))
+        logger.info("deconv layer %s (%s) input:%s filter:%s output:%s",
+                    op.name, op.type, input_shape, filter_shape, output_shape)
 
         self.add_output_shape(op, [output_shape])
 
@@ -206,27 +210,27 @@ class ShapeInference(object):
         self.add_output_shape(op, [output_shape])
 
     def infer_shape_slice(self, op):
-        output_shape = self._output_shape_cache[op.input[0]]
+        output_shape = list(self._output_shape_cache[op.input[0]])
         axis = ConverterUtil.get_arg(op, MaceKeyword.mace_axis_str).i
-        output_shape[axis] = (int)(output_shape[axis] / len(op.output))
+        output_shape[axis] = output_shape[axis] // len(op.output)
         output_shapes = []
         for _ in op.output:
-            output_shapes.append(output_shape)
+            output_shapes.append(list(output_shape))
         self.add_output_shape(op, output_shapes)
 
     def infer_shape_fully_connected(self, op):
         input_shape = self._output_shape_cache[op.input[0]]
         weight_shape = self._output_shape_cache[op.input[1]]
-        if ConverterUtil.data_format(op) == DataFormat.NCHW:
+        data_format = ConverterUtil.data_format(op)
+        if data_format == DataFormat.NCHW:
             output_shape = [input_shape[0], weight_shape[0], 1, 1]
         else:
-            mace_check(False, "format %s is not supported"
-                       % ConverterUtil.data_format(op))
+            mace_check(False, "format %s is not supported" % data_format)
         self.add_output_shape(op, [output_shape])
 
     def infer_shape_crop(self, op):
         mace_check(len(op.input) == 2, "crop layer needs two inputs")
-        output_shape = self._output_shape_cache[op.input[0]]
+        output_shape = list(self._output_shape_cache[op.input[0]])
         input1_shape = self._output_shape_cache[op.input[1]]
         offsets = ConverterUtil.get_arg(op, MaceKeyword.mace_offset_str).ints
         for i in range(len(offsets)):
@@ -241,7 +245,7 @@ class ShapeInference(object):
     def infer_shape_permute(self, op):
         output_shape = list(self._output_shape_cache[op.input[0]])
         dims = ConverterUtil.get_arg(op, MaceKeyword.mace_dims_str).ints
-        for i in xrange(len(dims)):
+        for i in six.moves.range(len(dims)):
             output_shape[i] = self._output_shape_cache[op.input[0]][dims[i]]
         self.add_output_shape(op, [output_shape])
 
@@ -259,25 +263,20 @@ class ShapeInference(object):
         self.add_output_shape(op, [output_shape])
 
     def infer_shape_reshape(self, op):
-        if ConverterUtil.get_arg(op, MaceKeyword.mace_dim_str) is not None:
-            dim = ConverterUtil.get_arg(op, MaceKeyword.mace_dim_str).ints
-            output_shape = list(dim)
-            product = input_size = 1
-            idx = -1
-            for i in range(len(self._output_shape_cache[op.input[0]])):
-                input_size *= self._output_shape_cache[op.input[0]][i]
-            for i in range(len(dim)):
-                if dim[i] == 0:
-                    output_shape[i] = self._output_shape_cache[op.input[0]][i]
-                    product *= self._output_shape_cache[op.input[0]][i]
-                elif dim[i] == -1:
-                    idx = i
+        dim_arg = ConverterUtil.get_arg(op, MaceKeyword.mace_dim_str)
+        if dim_arg is not None:
+            # shapes have a handful of dims, plain lists beat numpy here
+            input_shape = self._output_shape_cache[op.input[0]]
+            # 0 copies the dimension from input
+            output_shape = [input_shape[i] if d == 0 else d
+                            for i, d in enumerate(dim_arg.ints)]
+            # -1 is inferred from the remaining size
+            infer_axes = [i for i, d in enumerate(output_shape) if d == -1]
+            if infer_axes:
+                for i in infer_axes:
                     output_shape[i] = 1
-                else:
-                    output_shape[i] = dim[i]
-                    product *= dim[i]
-            if idx != -1:
-                output_shape[idx] = int(input_size / product)
+                output_shape[infer_axes[-1]] = \
+                    reduce(mul, input_shape, 1) // reduce(mul, output_shape, 1)
             self.add_output_shape(op, [output_shape])
         else:
             output_shape = []
@@ -301,12 +300,12 @@ class ShapeInference(object):
         input_shape = self._output_shape_cache[op.input[0]]
         size = ConverterUtil.get_arg(
             op, MaceKeyword.mace_resize_size_str).ints
-        if ConverterUtil.data_format(op) == DataFormat.NCHW:
+        data_format = ConverterUtil.data_format(op)
+        if data_format == DataFormat.NCHW:
             output_shape = [input_shape[0], input_shape[1], size[0], size[1]]
-        elif ConverterUtil.data_format(op) == DataFormat.NHWC:
+        elif data_format == DataFormat.NHWC:
             output_shape = [input_shape[0], size[0], size[1], input_shape[3]]
         else:
             output_shape = []
-            mace_check(False, "format %s is not supported"
-                       % ConverterUtil.data_format(op))
+            mace_check(False, "format %s is not supported" % data_format)
         self.add_output_shape(op, [output_shape])
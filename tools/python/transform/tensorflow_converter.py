@@ -12,8 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 import os
-import math
 import numpy as np
 import six
 import tensorflow as tf
@@ -37,6 +37,8 @@ from utils.util import mace_check
 from tensorflow.core.framework import tensor_shape_pb2
 from tensorflow.tools.graph_transforms import TransformGraph
 
+logger = logging.getLogger(__name__)
+
 tf_padding_str = 'padding'
 tf_strides_str = 'strides'
 tf_dilations_str = 'dilations'
@@ -290,15 +292,16 @@ class TensorflowConverter(base_converter.ConverterInterface):
         self._skip_tensor = set()
         self._output_shape = {}
 
-        print("Run transform_graph: %s" % TFTransformGraphOptions)
+        logger.info("Run transform_graph: %s", TFTransformGraphOptions)
         try:
-            print("output keys: ", option.output_nodes.keys())
+            logger.info("output keys: %s", option.output_nodes.keys())
             transformed_graph_def = TransformGraph(tf_graph_def,
                                                    option.input_nodes.keys(),
                                                    option.output_nodes.keys(),
                                                    TFTransformGraphOptions)
         except Exception as ex:
-            print("Failed to transform graph using tf tool: %s" % ex)
+            logger.warning("Failed to transform graph using tf tool: %s",
+                           ex)
             transformed_graph_def = tf_graph_def
 
         # To check optimized model, uncomment following code.
@@ -335,18 +338,20 @@ class TensorflowConverter(base_converter.ConverterInterface):
         return self._mace_net_def
 
     def replace_input_output_tensor_name(self):
+        output_rename = {name + ':0': name
+                         for name in self._option.output_nodes}
+        input_rename = {name + ':0': name
+                        for name in self._option.input_nodes}
+        input_rename.update(output_rename)
         for op in self._mace_net_def.op:
-            for i in six.moves.range(len(op.input)):
-                if op.input[i][-2:] == ':0':
-                    op_name = op.input[i][:-2]
-                    if op_name in self._option.input_nodes \
-                            or op_name in self._option.output_nodes:
-                        op.input[i] = op_name
-            for i in six.moves.range(len(op.output)):
-                if op.output[i][-2:] == ':0':
-                    op_name = op.output[i][:-2]
-                    if op_name in self._option.output_nodes:
-                        op.output[i] = op_name
+            for i, input_name in enumerate(op.input):
+                new_name = input_rename.get(input_name)
+                if new_name is not None:
+                    op.input[i] = new_name
+            for i, output_name in enumerate(op.output):
+                new_name = output_rename.get(output_name)
+                if new_name is not None:
+                    op.output[i] = new_name
 
     def add_shape_info(self, tf_graph_def):
         for node in tf_graph_def.node:
@@ -424,7 +429,8 @@ class TensorflowConverter(base_converter.ConverterInterface):
         tensor.name = name
         tensor.dims.extend(list(shape))
         tensor.data_type = data_type
-        tensor.float_data.extend(value.flat)
+        value = np.ascontiguousarray(value, dtype=np.float32)
+        tensor.float_data.extend(value.reshape(-1).tolist())
 
     # this function tries to infer tensor shape, but some dimension shape
     # may be undefined due to variance of input length
@@ -668,8 +674,7 @@ class TensorflowConverter(base_converter.ConverterInterface):
         scale_name = self.get_scope(tf_op.name) + '/scale:0'
         offset_name = self.get_scope(tf_op.name) + '/offset:0'
         scale_value = (
-                (1.0 / np.vectorize(math.sqrt)(
-                    var_value + epsilon_value)) * gamma_value)
+                (1.0 / np.sqrt(var_value + epsilon_value)) * gamma_value)
         offset_value = (-mean_value * scale_value) + beta_value
         self.add_tensor(scale_name, scale_value.shape, mace_pb2.DT_FLOAT,
                         scale_value)
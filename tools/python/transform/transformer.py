@@ -13,6 +13,7 @@
 # limitations under the License.
 
 
+import logging
 import re
 
 import numpy as np
@@ -20,6 +21,7 @@ import six
 
 from py_proto import mace_pb2
 from transform import base_converter
+from transform.base_converter import ActivationType
 from transform.base_converter import ConverterUtil
 from transform.base_converter import DataFormat
 from transform.base_converter import DeviceType
@@ -35,6 +37,15 @@ from transform.base_converter import TransformerRule
 from quantize import quantize_util
 from utils.util import mace_check
 
+logger = logging.getLogger(__name__)
+
+# ops which can fuse the following activation into themselves
+MaceActivationFusibleOps = frozenset([MaceOp.Conv2D.name,
+                                      MaceOp.Deconv2D.name,
+                                      MaceOp.DepthwiseConv2d.name,
+                                      MaceOp.FullyConnected.name,
+                                      MaceOp.BatchNorm.name])
+
 
 class Transformer(base_converter.ConverterInterface):
     """A class for transform naive mace model to optimized model.
@@ -66,6 +77,8 @@ class Transformer(base_converter.ConverterInterface):
                 self.fold_deconv_and_bn,  # data_format related
             TransformerRule.FOLD_DEPTHWISE_CONV_AND_BN:
                 self.fold_depthwise_conv_and_bn,  # data_format related
+            TransformerRule.FOLD_FC_AND_BN:
+                self.fold_fc_and_bn,  # data_format related
             TransformerRule.TRANSFORM_ADD_TO_BIASADD:
                 self.transform_add_to_biasadd,
             TransformerRule.REARRANGE_BATCH_TO_SPACE:
@@ -118,6 +131,34 @@ class Transformer(base_converter.ConverterInterface):
         self._model = model
         self._wino_arg = self._option.winograd
 
+        # device does not change during transforming
+        device = self._option.device
+        self._is_cpu = device == DeviceType.CPU.value
+        self._is_gpu = device == DeviceType.GPU.value
+        self._is_apu = device == DeviceType.APU.value
+        self._is_hta = device == DeviceType.HTA.value
+        self._is_hexagon_or_hta = \
+            device == DeviceType.HEXAGON.value or self._is_hta
+
+        # rules which do nothing with current option, skip them before
+        # constructing ops and consumers of the whole model
+        self._noop_transformers = set()
+        if self._wino_arg == 0:
+            self._noop_transformers.add(TransformerRule.ADD_WINOGRAD_ARG)
+        if not self._option.quantize:
+            self._noop_transformers.update([
+                TransformerRule.QUANTIZE_NODES,
+                TransformerRule.TRANSFORM_FAKE_QUANTIZE,
+                TransformerRule.REARRANGE_BATCH_TO_SPACE,
+                TransformerRule.CHECK_QUANTIZE_INFO])
+        if not self._is_cpu:
+            self._noop_transformers.update([
+                TransformerRule.TRANSPOSE_MATMUL_WEIGHT,
+                TransformerRule.FP16_MATMUL_WEIGHT])
+        if not self._is_gpu:
+            self._noop_transformers.add(
+                TransformerRule.TRANSFORM_BASIC_LSTMCELL)
+
         self._ops = {}
         self._consts = {}
         self._consumers = {}
@@ -131,6 +172,8 @@ class Transformer(base_converter.ConverterInterface):
 
     def run(self):
         for key in self._option.transformer_option:
+            if key in self._noop_transformers:
+                continue
             transformer = self._registered_transformers[key]
             while True:
                 self.construct_ops_and_consumers(key)
@@ -222,6 +265,15 @@ class Transformer(base_converter.ConverterInterface):
             if obj_list[i] == source:
                 obj_list[i] = target
 
+    @staticmethod
+    def transpose_const_tensor(tensor, order):
+        data = np.array(tensor.float_data, dtype=np.float32).reshape(
+            tensor.dims)
+        # materialize the transposed data so it is serialized sequentially
+        data = np.ascontiguousarray(data.transpose(order))
+        tensor.float_data[:] = data.ravel().tolist()
+        tensor.dims[:] = data.shape
+
     @staticmethod
     def transpose_shape(shape, order):
         transposed_shape = []
@@ -256,7 +308,7 @@ class Transformer(base_converter.ConverterInterface):
                     elif ConverterUtil.get_arg(producer, "T") is not None:
                         return ConverterUtil.get_arg(producer, "T").i
                     else:
-                        print("No data type filled: ", producer)
+                        logger.warning("No data type filled: %s", producer)
                         return None
         else:
             return None
@@ -271,11 +323,27 @@ class Transformer(base_converter.ConverterInterface):
     def consumer_count(self, tensor_name):
         return len(self._consumers.get(tensor_name, []))
 
+    def single_consumer(self, tensor_name):
+        """Return the consumer op if the tensor has exactly one, else None"""
+        consumers = self._consumers.get(tensor_name, [])
+        if len(consumers) == 1:
+            return consumers[0]
+        return None
+
+    def remove_unshared_const_inputs(self, op):
+        """Remove extra const inputs that only feed op, e.g. a transpose
+        perm. The first input is the data and is left alone."""
+        for input_name in op.input[1:]:
+            if input_name in self._consts \
+                    and self.consumer_count(input_name) == 1:
+                self._model.tensors.remove(self._consts[input_name])
+
     def is_op_output_node(self, op):
-        output_node_tensor_names = [out for out in
-                                    self._option.output_nodes]
+        # output_nodes is keyed by tensor name, look it up directly instead
+        # of copying and scanning all the names for every op
+        output_nodes = self._option.output_nodes
         for output in op.output:
-            if output in output_node_tensor_names:
+            if output in output_nodes:
                 return True
 
         return False
@@ -351,17 +419,55 @@ class Transformer(base_converter.ConverterInterface):
         net = self._model
         for op in net.op:
             if op.type == 'Identity':
-                print("Remove identity: %s(%s)" % (op.name, op.type))
+                logger.info("Remove identity: %s(%s)", op.name, op.type)
                 self.safe_remove_node(op,
                                       self._producer.get(op.input[0], None))
                 return True
             if op.type == 'Reshape' and \
                     op.output_shape[0].dims == \
                     self.get_tensor_shape(op.input[0]):
-                print("Remove useless reshape: %s(%s)" % (op.name, op.type))
+                logger.info("Remove useless reshape: %s(%s)", op.name, op.type)
                 self.safe_remove_node(op,
                                       self._producer.get(op.input[0], None))
                 return True
+            if op.type == MaceOp.Transpose.name:
+                dims = ConverterUtil.get_arg(op, MaceKeyword.mace_dims_str)
+                if dims is None:
+                    continue
+                if list(dims.ints) == list(six.moves.range(len(dims.ints))):
+                    # an output transpose fed by a graph input has no real
+                    # producer to take over the output name, keep it
+                    producer = self._producer.get(op.input[0], None)
+                    if producer is not None \
+                            and len(producer.output) == 1 \
+                            and (producer.name in self._ops
+                                 or not self.is_op_output_node(op)):
+                        logger.info("Remove identity transpose: %s(%s)",
+                                    op.name, op.type)
+                        self.remove_unshared_const_inputs(op)
+                        self.safe_remove_node(op, producer)
+                        return True
+                    continue
+                # transpose(transpose(x, p), q) == transpose(x, p[q]), so a
+                # layout round trip such as NCHW -> NHWC -> NCHW collapses
+                # into one identity transpose, removed on the next pass
+                consumer_op = self.single_consumer(op.output[0])
+                if consumer_op is not None \
+                        and consumer_op.type == MaceOp.Transpose.name \
+                        and not self.is_op_output_node(op):
+                    consumer_dims = ConverterUtil.get_arg(
+                        consumer_op, MaceKeyword.mace_dims_str)
+                    if consumer_dims is not None \
+                            and len(consumer_dims.ints) == len(dims.ints):
+                        logger.info("Merge transposes: %s(%s) and %s(%s)",
+                                    op.name, op.type, consumer_op.name,
+                                    consumer_op.type)
+                        consumer_dims.ints[:] = [dims.ints[i] for i in
+                                                 consumer_dims.ints]
+                        consumer_op.input[0] = op.input[0]
+                        self.remove_unshared_const_inputs(op)
+                        net.op.remove(op)
+                        return True
 
         return False
 
@@ -371,7 +477,8 @@ class Transformer(base_converter.ConverterInterface):
             if op.type == MaceOp.Pooling.name and \
                             ConverterUtil.get_arg(op,
                                                   MaceKeyword.mace_global_pooling_str) is not None:  # noqa
-                print("Transform global pooling: %s(%s)" % (op.name, op.type))
+                logger.info("Transform global pooling: %s(%s)",
+                            op.name, op.type)
                 input_shape = self._producer[op.input[0]].output_shape[0].dims
                 if ConverterUtil.data_format(op) == DataFormat.NHWC:
                     kernel_shape = input_shape[1:3]
@@ -405,7 +512,7 @@ class Transformer(base_converter.ConverterInterface):
                         and len(consumer_op.input) == 2 \
                         and consumer_op.input[1] in self._consts \
                         and len(self._consts[consumer_op.input[1]].dims) == 1:
-                    print("Fold batchnorm: %s(%s)" % (op.name, op.type))
+                    logger.info("Fold batchnorm: %s(%s)", op.name, op.type)
                     consumer_op.type = MaceOp.BatchNorm.name
                     consumer_op.input[:] = [op.input[0], op.input[1],
                                             consumer_op.input[1]]
@@ -437,7 +544,7 @@ class Transformer(base_converter.ConverterInterface):
                                 len(consumer_op.input) == 1 and\
                                 axis[0] == 1 and axis[1] == 2 and\
                                 keep_dims > 0:
-                            print("Fold SquaredDiff Reduce: %s" % op.name)
+                            logger.info("Fold SquaredDiff Reduce: %s", op.name)
                             op.type = MaceOp.SqrDiffMean.name
                             op.output[0] = consumer_op.output[0]
                             self.replace_quantize_info(op, consumer_op)
@@ -459,7 +566,7 @@ class Transformer(base_converter.ConverterInterface):
                             len(consumer_op.input) == 1 and
                             op.input[0] in self._consts and
                             self.consumer_count(op.input[0]) == 1):
-                    print("Fold Gather and Mul: %s" % op.name)
+                    logger.info("Fold Gather and Mul: %s", op.name)
                     gather_weights = self._consts[op.input[0]]
                     mul_weight = ConverterUtil.get_arg(consumer_op,
                                                        MaceKeyword.mace_scalar_input_str).f  # noqa
@@ -475,7 +582,7 @@ class Transformer(base_converter.ConverterInterface):
         for op in net.op:
             if op.type == MaceOp.Fill.name and \
                     zero_state_pattern.match(op.name):
-                print("Transform lstm zerostate")
+                logger.info("Transform lstm zerostate")
                 concat_op = self._producer[op.input[0]]
                 consumer_op = self._consumers[op.output[0]][0]
 
@@ -503,7 +610,7 @@ class Transformer(base_converter.ConverterInterface):
                 return True
 
     def transform_basic_lstmcell(self):
-        if self._option.device != DeviceType.GPU.value:
+        if not self._is_gpu:
             return False
 
         net = self._model
@@ -512,7 +619,7 @@ class Transformer(base_converter.ConverterInterface):
         for op in net.op:
             if op.type == MaceOp.Concat.name and \
                     basic_lstm_concat_pattern.match(op.name):
-                print("Transform basic lstmcell")
+                logger.info("Transform basic lstmcell")
                 ops_to_delete = []
                 ops_to_delete.extend([op])
 
@@ -618,14 +725,15 @@ class Transformer(base_converter.ConverterInterface):
     def fold_conv_and_bn(self):
         net = self._model
         for op in net.op:
-            if (op.type == MaceOp.Conv2D.name) \
-                    and self.consumer_count(op.output[0]) == 1:
-                consumer_op = self._consumers[op.output[0]][0]
+            if op.type != MaceOp.Conv2D.name:
+                continue
+            consumer_op = self.single_consumer(op.output[0])
+            if consumer_op is not None:
                 input_len = len(op.input)
                 if (consumer_op.type == MaceOp.BatchNorm.name
                         and (input_len == 2 or (input_len == 3 and op.input[-1] in self._consts))  # noqa
-                        and len(self._consumers[op.input[1]]) == 1):
-                    print("Fold conv and bn: %s(%s)" % (op.name, op.type))
+                        and self.consumer_count(op.input[1]) == 1):
+                    logger.info("Fold conv and bn: %s(%s)", op.name, op.type)
                     filter = self._consts[op.input[1]]
                     scale = self._consts[consumer_op.input[1]]
                     offset = self._consts[consumer_op.input[2]]
@@ -671,9 +779,11 @@ class Transformer(base_converter.ConverterInterface):
     def fold_deconv_and_bn(self):
         net = self._model
         for op in net.op:
-            if (op.type in [MaceOp.Deconv2D.name, MaceOp.DepthwiseDeconv2d]) \
-                    and self.consumer_count(op.output[0]) == 1:
-                consumer_op = self._consumers[op.output[0]][0]
+            if op.type not in [MaceOp.Deconv2D.name,
+                               MaceOp.DepthwiseDeconv2d]:
+                continue
+            consumer_op = self.single_consumer(op.output[0])
+            if consumer_op is not None:
                 framework = ConverterUtil.get_arg(
                         op, MaceKeyword.mace_framework_type_str).i
                 input_len = len(op.input)
@@ -684,8 +794,8 @@ class Transformer(base_converter.ConverterInterface):
                         (framework == FrameworkType.TENSORFLOW.value and
                          (input_len == 3 or (input_len == 4 and
                                              op.input[-1] in self._consts))))
-                        and len(self._consumers[op.input[1]]) == 1):
-                    print("Fold deconv and bn: %s(%s)" % (op.name, op.type))
+                        and self.consumer_count(op.input[1]) == 1):
+                    logger.info("Fold deconv and bn: %s(%s)", op.name, op.type)
                     filter = self._consts[op.input[1]]
                     scale = self._consts[consumer_op.input[1]]
                     offset = self._consts[consumer_op.input[2]]
@@ -741,15 +851,16 @@ class Transformer(base_converter.ConverterInterface):
     def fold_depthwise_conv_and_bn(self):
         net = self._model
         for op in net.op:
-            if op.type == MaceOp.DepthwiseConv2d.name \
-                    and self.consumer_count(op.output[0]) == 1:
-                consumer_op = self._consumers[op.output[0]][0]
+            if op.type != MaceOp.DepthwiseConv2d.name:
+                continue
+            consumer_op = self.single_consumer(op.output[0])
+            if consumer_op is not None:
                 input_len = len(op.input)
                 if (consumer_op.type == MaceOp.BatchNorm.name
                         and (input_len == 2 or (input_len == 3 and op.input[-1] in self._consts))  # noqa
-                        and len(self._consumers[op.input[1]]) == 1):
-                    print("Fold depthwise conv and bn: %s(%s)"
-                          % (op.name, op.type))
+                        and self.consumer_count(op.input[1]) == 1):
+                    logger.info("Fold depthwise conv and bn: %s(%s)",
+                                op.name, op.type)
                     filter = self._consts[op.input[1]]
                     scale = self._consts[consumer_op.input[1]]
                     offset = self._consts[consumer_op.input[2]]
@@ -795,6 +906,59 @@ class Transformer(base_converter.ConverterInterface):
 
         return False
 
+    def fold_fc_and_bn(self):
+        net = self._model
+        for op in net.op:
+            if op.type != MaceOp.FullyConnected.name:
+                continue
+            consumer_op = self.single_consumer(op.output[0])
+            if consumer_op is not None:
+                input_len = len(op.input)
+                if (consumer_op.type == MaceOp.BatchNorm.name
+                        and (input_len == 2 or (input_len == 3 and op.input[-1] in self._consts))  # noqa
+                        and self.consumer_count(op.input[1]) == 1):
+                    logger.info("Fold fc and bn: %s(%s)", op.name, op.type)
+                    weight = self._consts[op.input[1]]
+                    scale = self._consts[consumer_op.input[1]]
+                    offset = self._consts[consumer_op.input[2]]
+                    scale_data = np.array(scale.float_data, dtype=np.float32)
+                    weight_data = np.array(weight.float_data,
+                                           dtype=np.float32)
+
+                    filter_format = self.filter_format()
+                    if filter_format == DataFormat.HWIO:
+                        # output channel is the innermost dimension
+                        weight_data = weight_data.reshape(-1, weight.dims[-1])
+                        weight_data *= scale_data
+                    elif filter_format == DataFormat.OIHW:
+                        weight_data = weight_data.reshape(weight.dims[0], -1)
+                        weight_data *= scale_data[:, np.newaxis]
+                    else:
+                        mace_check(False, "filter format %s not supported" %
+                                   filter_format)
+                    weight.float_data[:] = weight_data.ravel().tolist()
+
+                    if len(op.input) == 3:
+                        fc_bias = self._consts[op.input[2]]
+                        bias_data = np.array(fc_bias.float_data,
+                                             dtype=np.float32)
+                        bias_data = bias_data * scale_data + np.array(
+                            offset.float_data, dtype=np.float32)
+                        fc_bias.float_data[:] = bias_data.tolist()
+                        net.tensors.remove(offset)
+                    else:
+                        op.input.extend([consumer_op.input[2]])
+
+                    # remove bn
+                    del consumer_op.input[:]
+                    net.tensors.remove(scale)
+                    self.replace_quantize_info(op, consumer_op)
+                    self.safe_remove_node(consumer_op, op)
+
+                    return True
+
+        return False
+
     @staticmethod
     def sort_feature_map_shape(shape, data_format):
         """Return shape in NHWC order"""
@@ -839,7 +1003,8 @@ class Transformer(base_converter.ConverterInterface):
                     and len(op.input) == 2
                     and op.input[1] in self._consts
                     and len(self._consts[op.input[1]].dims) == 1):
-                print("Transform add to biasadd: %s(%s)" % (op.name, op.type))
+                logger.info("Transform add to biasadd: %s(%s)",
+                            op.name, op.type)
                 op.type = MaceOp.BiasAdd.name
                 return True
 
@@ -870,11 +1035,11 @@ class Transformer(base_converter.ConverterInterface):
                                         op,
                                         MaceKeyword.mace_framework_type_str).i
                              == FrameworkType.TENSORFLOW.value
-                             and len(op.input) == 3)))) \
-                    and len(self._consumers.get(op.output[0], [])) == 1:
-                consumer_op = self._consumers[op.output[0]][0]
-                if consumer_op.type == MaceOp.BiasAdd.name:
-                    print("Fold biasadd: %s(%s)" % (op.name, op.type))
+                             and len(op.input) == 3)))):
+                consumer_op = self.single_consumer(op.output[0])
+                if consumer_op is not None \
+                        and consumer_op.type == MaceOp.BiasAdd.name:
+                    logger.info("Fold biasadd: %s(%s)", op.name, op.type)
                     op.name = consumer_op.name
                     op.output[0] = consumer_op.output[0]
                     op.input.append(consumer_op.input[1])
@@ -885,22 +1050,20 @@ class Transformer(base_converter.ConverterInterface):
         return False
 
     def flatten_atrous_conv(self):
-        if self._option.device != DeviceType.GPU.value \
-               and self._option.device != DeviceType.APU.value \
-               and self._option.device != DeviceType.HTA.value:
+        if not (self._is_gpu or self._is_apu or self._is_hta):
             return
 
         net = self._model
         for op in net.op:
             if (op.type == MaceOp.SpaceToBatchND.name
-                    and len(self._consumers.get(op.output[0], [])) == 1):
-                conv_op = self._consumers.get(op.output[0])[0]
+                    and self.consumer_count(op.output[0]) == 1):
+                conv_op = self._consumers[op.output[0]][0]
                 if (conv_op.type == MaceOp.Conv2D.name
                         or conv_op.type == MaceOp.DepthwiseConv2d.name) \
-                        and len(self._consumers.get(conv_op.output[0], [])) == 1:  # noqa
-                    b2s_op = self._consumers.get(conv_op.output[0])[0]
+                        and self.consumer_count(conv_op.output[0]) == 1:
+                    b2s_op = self._consumers[conv_op.output[0]][0]
                     if b2s_op.type == MaceOp.BatchToSpaceND.name:
-                        six.print_("Flatten atrous convolution")
+                        logger.info("Flatten atrous convolution")
                         # Add args.
                         padding_arg_values = ConverterUtil.get_arg(
                             op,
@@ -951,18 +1114,16 @@ class Transformer(base_converter.ConverterInterface):
     def fold_activation(self):
         net = self._model
         for op in net.op:
-            if (op.type == MaceOp.Conv2D.name
-                or op.type == MaceOp.Deconv2D.name
-                or op.type == MaceOp.DepthwiseConv2d.name
-                or op.type == MaceOp.FullyConnected.name
-                or op.type == MaceOp.BatchNorm.name) \
-                    and len(self._consumers.get(op.output[0], [])) == 1:
-                consumer_op = self._consumers[op.output[0]][0]
+            if op.type not in MaceActivationFusibleOps:
+                continue
+            consumer_op = self.single_consumer(op.output[0])
+            if consumer_op is not None:
                 if consumer_op.type == MaceOp.Activation.name \
                         and ConverterUtil.get_arg(
                             consumer_op,
-                            MaceKeyword.mace_activation_type_str).s != 'PRELU':
-                    print("Fold activation: %s(%s)" % (op.name, op.type))
+                            MaceKeyword.mace_activation_type_str).s != \
+                        six.b(ActivationType.PRELU.name):
+                    logger.info("Fold activation: %s(%s)", op.name, op.type)
                     op.name = consumer_op.name
                     op.output[0] = consumer_op.output[0]
                     for arg in consumer_op.arg:
@@ -1014,8 +1175,8 @@ class Transformer(base_converter.ConverterInterface):
                 if height == filter_height and width == filter_width \
                         and zero_padding \
                         and len(self._consumers[op.input[1]]) == 1:
-                    print("transform global conv to fc %s(%s)"
-                          % (op.name, op.type))
+                    logger.info("transform global conv to fc %s(%s)",
+                                op.name, op.type)
                     op.type = MaceOp.FullyConnected.name
 
         return False
@@ -1027,7 +1188,7 @@ class Transformer(base_converter.ConverterInterface):
             if op.type == MaceOp.FullyConnected.name:
                 weight = self._consts[op.input[1]]
                 if len(weight.dims) == 2:
-                    print("Reshape fully connected weight shape")
+                    logger.info("Reshape fully connected weight shape")
                     input_op = self._producer[op.input[0]]
                     input_shape = list(input_op.output_shape[0].dims)
                     weight.dims[:] = [weight.dims[0]] + input_shape[1:]
@@ -1048,24 +1209,46 @@ class Transformer(base_converter.ConverterInterface):
         net = self._model
 
         for op in net.op:
-            if op.type == MaceOp.Conv2D.name:
+            if op.type == MaceOp.Conv2D.name \
+                    and self.winograd_applicable(op):
                 winograd_arg = op.arg.add()
                 winograd_arg.name = MaceKeyword.mace_wino_arg_str
                 winograd_arg.i = self._wino_arg
 
         return False
 
+    def winograd_applicable(self, op):
+        """Winograd only handles 3x3 filters with stride 1 and dilation 1.
+        Decide it once here so the runtime does not need to check convs
+        that can never take the winograd path."""
+        if op.input[1] in self._consts \
+                and self.filter_format() == DataFormat.OIHW:
+            filter_dims = self._consts[op.input[1]].dims
+            if len(filter_dims) != 4 or filter_dims[2] != 3 \
+                    or filter_dims[3] != 3:
+                return False
+        strides_arg = ConverterUtil.get_arg(op, MaceKeyword.mace_strides_str)
+        if strides_arg is not None \
+                and any(stride > 1 for stride in strides_arg.ints):
+            return False
+        dilations_arg = ConverterUtil.get_arg(op,
+                                              MaceKeyword.mace_dilations_str)
+        if dilations_arg is not None \
+                and any(dilation > 1 for dilation in dilations_arg.ints):
+            return False
+        return True
+
     def transpose_matmul_weight(self):
-        if self._option.device != DeviceType.CPU.value:
+        if not self._is_cpu:
             return False
         net = self._model
-        transposed_weights = []
+        transposed_weights = set()
         for op in net.op:
             if op.type == MaceOp.MatMul.name:  # noqa
                 rhs = op.input[1]
                 if rhs in self._consts and len(self._consts[rhs].dims) == 2:
                     arg = ConverterUtil.get_arg(op, MaceKeyword.mace_transpose_b_str)  # noqa
-                    # six.print_("Transpose matmul weight %s" % rhs)
+                    # logger.info("Transpose matmul weight %s", rhs)
                     if arg is None:
                         arg = op.arg.add()
                         arg.name = MaceKeyword.mace_transpose_b_str
@@ -1074,14 +1257,10 @@ class Transformer(base_converter.ConverterInterface):
                         arg.i = 1
                         if rhs not in transposed_weights:
                             filter = self._consts[rhs]
-                            filter_data = np.array(filter.float_data).reshape(
-                                filter.dims)
-                            filter_data = filter_data.transpose(1, 0)
-                            filter.float_data[:] = filter_data.flat
-                            filter.dims[:] = filter_data.shape
-                            transposed_weights.append(rhs)
-                            six.print_('Transpose matmul weight to shape:',
-                                       filter.dims)
+                            self.transpose_const_tensor(filter, [1, 0])
+                            transposed_weights.add(rhs)
+                            logger.info("Transpose matmul weight to shape: %s",
+                                        filter.dims)
 
     def transpose_filters(self):
         net = self._model
@@ -1089,10 +1268,8 @@ class Transformer(base_converter.ConverterInterface):
         transposed_filter = set()
         transposed_deconv_filter = set()
 
-        if self._option.quantize and \
-                (self._option.device == DeviceType.CPU.value or
-                 self._option.device == DeviceType.APU.value):
-            print("Transpose filters to OHWI")
+        if self._option.quantize and (self._is_cpu or self._is_apu):
+            logger.info("Transpose filters to OHWI")
             if filter_format == DataFormat.HWIO:
                 transpose_order = [3, 0, 1, 2]
             elif filter_format == DataFormat.OIHW:
@@ -1105,32 +1282,22 @@ class Transformer(base_converter.ConverterInterface):
                 if (op.type == MaceOp.Conv2D.name or
                     op.type == MaceOp.Deconv2D.name or
                     (op.type == MaceOp.DepthwiseConv2d.name and
-                     self._option.device == DeviceType.APU.value)) and\
+                     self._is_apu)) and\
                         op.input[1] not in transposed_filter:
                     filter = self._consts[op.input[1]]
-                    filter_data = np.array(filter.float_data).reshape(
-                        filter.dims)
-                    filter_data = filter_data.transpose(transpose_order)
-                    filter.float_data[:] = filter_data.flat
-                    filter.dims[:] = filter_data.shape
+                    self.transpose_const_tensor(filter, transpose_order)
                     transposed_filter.add(op.input[1])
             # deconv's filter's output channel and input channel is reversed
             for op in net.op:
                 if op.type == MaceOp.Deconv2D.name and \
                         op.input[1] not in transposed_deconv_filter:
                     filter = self._consts[op.input[1]]
-                    filter_data = np.array(filter.float_data).reshape(
-                        filter.dims)
-                    filter_data = filter_data.transpose(3, 1, 2, 0)
-                    filter.float_data[:] = filter_data.flat
-                    filter.dims[:] = filter_data.shape
+                    self.transpose_const_tensor(filter, [3, 1, 2, 0])
                     transposed_deconv_filter.add(op.input[1])
 
             self.set_filter_format(DataFormat.OHWI)
-        elif self._option.quantize and \
-                (self._option.device == DeviceType.HEXAGON.value or
-                 self._option.device == DeviceType.HTA.value):
-            print("Transpose filters to HWIO/HWIM")
+        elif self._option.quantize and self._is_hexagon_or_hta:
+            logger.info("Transpose filters to HWIO/HWIM")
             mace_check(filter_format == DataFormat.HWIO,
                        "HEXAGON only support HWIO/HWIM filter format.")
         else:
@@ -1142,13 +1309,10 @@ class Transformer(base_converter.ConverterInterface):
                             or op.type == MaceOp.DepthwiseConv2d.name) \
                             and op.input[1] in self._consts \
                             and op.input[1] not in transposed_filter:
-                        print("Transpose Conv2D/Deconv2D filters to OIHW/MIHW")
+                        logger.info(
+                            "Transpose Conv2D/Deconv2D filters to OIHW/MIHW")
                         filter = self._consts[op.input[1]]
-                        filter_data = np.array(filter.float_data).reshape(
-                            filter.dims)
-                        filter_data = filter_data.transpose(3, 2, 0, 1)
-                        filter.float_data[:] = filter_data.flat
-                        filter.dims[:] = filter_data.shape
+                        self.transpose_const_tensor(filter, [3, 2, 0, 1])
                         transposed_filter.add(op.input[1])
                     if (op.type == MaceOp.MatMul.name and
                             (ConverterUtil.get_arg(
@@ -1156,25 +1320,17 @@ class Transformer(base_converter.ConverterInterface):
                                 MaceKeyword.mace_winograd_filter_transformed)
                                  is not None)  # noqa
                             and op.input[1] not in transposed_filter):
-                        print("Transpose Winograd filters to OIHW/MIHW")
+                        logger.info("Transpose Winograd filters to OIHW/MIHW")
                         filter = self._consts[op.input[0]]
-                        filter_data = np.array(filter.float_data).reshape(
-                            filter.dims)
-                        filter_data = filter_data.transpose(3, 2, 0, 1)
-                        filter.float_data[:] = filter_data.flat
-                        filter.dims[:] = filter_data.shape
+                        self.transpose_const_tensor(filter, [3, 2, 0, 1])
                         transposed_filter.add(op.input[0])
                     if op.type == MaceOp.FullyConnected.name \
                             and op.input[1] not in transposed_filter:
                         weight = self._consts[op.input[1]]
                         if len(weight.dims) == 4:
-                            print("Transpose FullyConnected filters to"
-                                  " OIHW/MIHW")
-                            weight_data = np.array(weight.float_data).reshape(
-                                weight.dims)
-                            weight_data = weight_data.transpose(3, 2, 0, 1)
-                            weight.float_data[:] = weight_data.flat
-                            weight.dims[:] = weight_data.shape
+                            logger.info("Transpose FullyConnected filters to"
+                                        " OIHW/MIHW")
+                            self.transpose_const_tensor(weight, [3, 2, 0, 1])
                             transposed_filter.add(op.input[1])
 
                 self.set_filter_format(DataFormat.OIHW)
@@ -1184,11 +1340,7 @@ class Transformer(base_converter.ConverterInterface):
                                MaceOp.DepthwiseDeconv2d] \
                         and op.input[1] not in transposed_deconv_filter:
                     filter = self._consts[op.input[1]]
-                    filter_data = np.array(filter.float_data).reshape(
-                        filter.dims)
-                    filter_data = filter_data.transpose(1, 0, 2, 3)
-                    filter.float_data[:] = filter_data.flat
-                    filter.dims[:] = filter_data.shape
+                    self.transpose_const_tensor(filter, [1, 0, 2, 3])
                     transposed_deconv_filter.add(op.input[1])
 
         return False
@@ -1211,9 +1363,8 @@ class Transformer(base_converter.ConverterInterface):
                         should_fold = True
 
                 if should_fold:
-                    print(
-                        "Fold reshape and softmax: %s(%s)"
-                        % (op.name, op.type))
+                    logger.info("Fold reshape and softmax: %s(%s)",
+                                op.name, op.type)
                     producer = self._producer[op.input[0]]
                     op.output_shape[0].dims[:] = self.get_tensor_shape(
                         producer.input[0])
@@ -1282,7 +1433,7 @@ class Transformer(base_converter.ConverterInterface):
                                weight.dims[0] != op.output_shape[0].dims[1]:
                                 is_fc = False
                     if is_fc:
-                        print('convert reshape and matmul to fc')
+                        logger.info('convert reshape and matmul to fc')
                         self.safe_remove_node(op, input_op,
                                               remove_input_tensor=True)
                         for matmul_op in consumers:
@@ -1303,7 +1454,7 @@ class Transformer(base_converter.ConverterInterface):
                 if len(weight.dims) == 2 and self.is_after_fc(op) and \
                         len(producer.output_shape[0].dims) == 2 and \
                         weight.dims[0] == producer.output_shape[0].dims[1]:
-                    six.print_('convert matmul to fc')
+                    logger.info('convert matmul to fc')
                     op.type = MaceOp.FullyConnected.name
                     weight_data = np.array(weight.float_data).reshape(
                         weight.dims)
@@ -1313,7 +1464,7 @@ class Transformer(base_converter.ConverterInterface):
         return False
 
     def update_float_op_data_type(self):
-        print("update op with float data type")
+        logger.info("update op with float data type")
         net = self._model
         data_type = self._option.data_type
         net.data_type = data_type
@@ -1334,37 +1485,52 @@ class Transformer(base_converter.ConverterInterface):
 
         return False
 
-    def sort_dfs(self, op, visited, sorted_nodes):
-        if op.name in visited:
-            return
-        visited.update([op.name])
-        if len(op.input) > 0:
-            for input_tensor in op.input:
-                producer_op = self._producer.get(input_tensor, None)
-                if producer_op is None:
-                    pass
-                elif producer_op.name not in visited:
-                    self.sort_dfs(producer_op, visited, sorted_nodes)
-        sorted_nodes.append(op)
-
     def sort_by_execution(self):
-        print("Sort by execution")
+        logger.info("Sort by execution")
         net = self._model
-        visited = set()
-        sorted_nodes = []
 
         output_nodes = self._option.check_nodes.keys()
         if not self._quantize_activation_info:
             output_nodes.extend(self._option.output_nodes)
+
+        # iterative post-order DFS from the output nodes, which keeps the
+        # op order of a recursive DFS without hitting the recursion limit
+        # on deep models. visiting holds the ops on the current DFS path.
+        visited = set()
+        visiting = set()
+        sorted_nodes = []
         for output_node in output_nodes:
             mace_check(output_node in self._producer,
                        "output_tensor %s not existed in model" % output_node)
-            self.sort_dfs(self._producer[output_node], visited, sorted_nodes)
+            root_op = self._producer[output_node]
+            if root_op.name in visited:
+                continue
+            visited.add(root_op.name)
+            visiting.add(root_op.name)
+            stack = [(root_op, 0)]
+            while stack:
+                op, input_idx = stack[-1]
+                if input_idx == len(op.input):
+                    stack.pop()
+                    visiting.remove(op.name)
+                    sorted_nodes.append(op)
+                    continue
+                stack[-1] = (op, input_idx + 1)
+                producer_op = self._producer.get(op.input[input_idx], None)
+                if producer_op is None:
+                    continue
+                mace_check(producer_op.name not in visiting,
+                           "Model graph is not a DAG, can not sort ops by"
+                           " execution")
+                if producer_op.name not in visited:
+                    visited.add(producer_op.name)
+                    visiting.add(producer_op.name)
+                    stack.append((producer_op, 0))
 
         del net.op[:]
         net.op.extend(sorted_nodes)
 
-        print("Final ops:")
+        logger.info("Final ops:")
         index = 0
         for op in net.op:
             if op.type not in [MaceOp.Quantize.name, MaceOp.Dequantize.name]:
@@ -1372,8 +1538,8 @@ class Transformer(base_converter.ConverterInterface):
                 index += 1
             else:
                 index_str = ''
-            print("%s (%s, index:%s): %s" % (op.name, op.type, index_str, [
-                out_shape.dims for out_shape in op.output_shape]))
+            logger.info("%s (%s, index:%s): %s", op.name, op.type, index_str,
+                        [out_shape.dims for out_shape in op.output_shape])
         return False
 
     def is_transposable_data_format_ops(self, op):
@@ -1382,12 +1548,12 @@ class Transformer(base_converter.ConverterInterface):
             out_dims_len = len(op.output_shape[0].dims)
             if len(input_op.output_shape[0].dims) != 4 \
                     or (out_dims_len != 4 and out_dims_len != 2):
-                print("In this model, reshape is not transposable op.")
+                logger.info("In this model, reshape is not transposable op.")
                 return False
         return op.type in MaceTransposableDataFormatOps
 
     def update_data_format(self):
-        print("update data format")
+        logger.info("update data format")
         net = self._model
         for op in net.op:
             df_arg = ConverterUtil.get_arg(
@@ -1420,7 +1586,7 @@ class Transformer(base_converter.ConverterInterface):
         return False
 
     def transpose_data_format(self):
-        print("Transpose arguments based on data format")
+        logger.info("Transpose arguments based on data format")
         net = self._model
 
         src_data_format = ConverterUtil.data_format(net)
@@ -1435,8 +1601,8 @@ class Transformer(base_converter.ConverterInterface):
                                    "pad dim rank should be 8.")
                         if src_data_format == DataFormat.NCHW and \
                                 has_data_format:
-                            print("Transpose pad args: %s(%s)"
-                                  % (op.name, op.type))
+                            logger.info("Transpose pad args: %s(%s)",
+                                        op.name, op.type)
                             self.transpose_shape(arg.ints,
                                                  [0, 1, 4, 5, 6, 7, 2, 3])
             elif op.type == MaceOp.Concat.name or op.type == MaceOp.Split.name:
@@ -1445,8 +1611,8 @@ class Transformer(base_converter.ConverterInterface):
                         if (src_data_format == DataFormat.NCHW
                                 and has_data_format
                                 and len(op.output_shape[0].dims) == 4):
-                            print("Transpose concat/split args: %s(%s)"
-                                  % (op.name, op.type))
+                            logger.info("Transpose concat/split args: %s(%s)",
+                                        op.name, op.type)
                             if arg.i == 1:
                                 arg.i = 3
                             elif arg.i == 2:
@@ -1471,8 +1637,8 @@ class Transformer(base_converter.ConverterInterface):
                                 and len(self._producer[op.input[0]].output_shape[0].dims) == 4  # noqa
                                 and len(op.output_shape[0].dims) == 2
                                 and arg.ints == [2, 3]):
-                            print("Transpose squeeze args: %s(%s)"
-                                  % (op.name, op.type))
+                            logger.info("Transpose squeeze args: %s(%s)",
+                                        op.name, op.type)
                             arg.ints[:] = [1, 2]
 
             elif op.type == MaceOp.Reduce.name:
@@ -1480,8 +1646,8 @@ class Transformer(base_converter.ConverterInterface):
                     if arg.name == MaceKeyword.mace_axis_str:
                         if src_data_format == DataFormat.NCHW and \
                                 has_data_format:
-                            print("Transpose reduce args: %s(%s)"
-                                  % (op.name, op.type))
+                            logger.info("Transpose reduce args: %s(%s)",
+                                        op.name, op.type)
                             reduce_axises = list(arg.ints)
                             new_axises = []
                             for i in range(len(reduce_axises)):
@@ -1503,8 +1669,7 @@ class Transformer(base_converter.ConverterInterface):
                            and has_data_format
                            and len(op.output_shape[0].dims) == 4,
                            "MACE only support crop with NCHW format")
-                print("Transpose crop args: %s(%s)"
-                      % (op.name, op.type))
+                logger.info("Transpose crop args: %s(%s)", op.name, op.type)
                 self.transpose_shape(offset_arg.ints, [0, 2, 3, 1])
             elif op.type == MaceOp.Reshape.name:
                 for arg in op.arg:
@@ -1517,7 +1682,8 @@ class Transformer(base_converter.ConverterInterface):
             # transpose op output shape
             if src_data_format == DataFormat.NCHW and \
                     has_data_format:
-                print("Transpose output shapes: %s(%s)" % (op.name, op.type))
+                logger.info("Transpose output shapes: %s(%s)",
+                            op.name, op.type)
                 for output_shape in op.output_shape:
                     if len(output_shape.dims) == 4:
                         self.transpose_shape(output_shape.dims,
@@ -1529,7 +1695,7 @@ class Transformer(base_converter.ConverterInterface):
         if not self._option.quantize:
             return False
 
-        print("Add mace quantize and dequantize nodes")
+        logger.info("Add mace quantize and dequantize nodes")
 
         for op in self._model.op:
             for i in range(len(op.input)):
@@ -1639,8 +1805,7 @@ class Transformer(base_converter.ConverterInterface):
                         if len(ops[0].input) >= 4:
                             check_deconv = ops[0].input[3] == tensor.name
             if check_conv or check_deconv:
-                if self._option.device == DeviceType.CPU.value \
-                       or self._option.device == DeviceType.APU.value:
+                if self._is_cpu or self._is_apu:
                     conv_op = ops[0]
                     scale_input = self._quantize_activation_info[
                         conv_op.input[0]].scale
@@ -1651,8 +1816,7 @@ class Transformer(base_converter.ConverterInterface):
                     quantized_tensor = \
                         quantize_util.quantize_with_scale_and_zero(
                             tensor.float_data, scale, 0)
-                elif self._option.device == DeviceType.HEXAGON.value or \
-                        self._option.device == DeviceType.HTA.value:
+                elif self._is_hexagon_or_hta:
                     quantized_tensor = \
                         quantize_util.quantize_bias_for_hexagon(
                             tensor.float_data)
@@ -1660,7 +1824,7 @@ class Transformer(base_converter.ConverterInterface):
                     mace_check(False, "wrong device.")
                 tensor.data_type = mace_pb2.DT_INT32
             else:
-                non_zero = self._option.device == DeviceType.CPU.value
+                non_zero = self._is_cpu
                 quantized_tensor = quantize_util.quantize(tensor.float_data,
                                                           self._option.device,
                                                           non_zero)
@@ -1678,7 +1842,7 @@ class Transformer(base_converter.ConverterInterface):
         return False
 
     def quantize_weights(self):
-        print("Quantize weights")
+        logger.info("Quantize weights")
         net = self._model
         for tensor in net.tensors:
             self.quantize_tensor(tensor)
@@ -1707,7 +1871,7 @@ class Transformer(base_converter.ConverterInterface):
                     self._quantized_tensor.update([tensor.name])
 
     def quantize_large_weights(self):
-        print("Quantize large weights")
+        logger.info("Quantize large weights")
         net = self._model
         for tensor in net.tensors:
             self.quantize_large_tensor(tensor)
@@ -1738,7 +1902,7 @@ class Transformer(base_converter.ConverterInterface):
             return False
 
         # Quantize info from fixpoint fine tune
-        print("Transform fake quantize")
+        logger.info("Transform fake quantize")
         range_file = self._option.quantize_range_file
         if range_file:
             return
@@ -1758,7 +1922,7 @@ class Transformer(base_converter.ConverterInterface):
                     self._quantize_activation_info[op.output[0]] = \
                         quantize_info
 
-                    print(op.input[0], op.output[0])
+                    logger.info("%s %s", op.input[0], op.output[0])
                 op.type = MaceOp.Identity.name
 
         return False
@@ -1795,8 +1959,8 @@ class Transformer(base_converter.ConverterInterface):
                                              biasadd_op.output[0],
                                              b2s_op.output[0])
 
-                        print("Rearrange batch to space: %s(%s)"
-                              % (b2s_op.name, b2s_op.type))
+                        logger.info("Rearrange batch to space: %s(%s)",
+                                    b2s_op.name, b2s_op.type)
                         return True
                     elif biasadd_or_act_op.type == MaceOp.Activation.name:
                         act_op = biasadd_or_act_op
@@ -1807,8 +1971,8 @@ class Transformer(base_converter.ConverterInterface):
                                          act_op.output[0],
                                          b2s_op.output[0])
 
-                        print("Rearrange batch to space: %s(%s)"
-                              % (b2s_op.name, b2s_op.type))
+                        logger.info("Rearrange batch to space: %s(%s)",
+                                    b2s_op.name, b2s_op.type)
                         return True
 
         return False
@@ -1817,7 +1981,7 @@ class Transformer(base_converter.ConverterInterface):
         # Quantize info from range statistics
         range_file = self._option.quantize_range_file
         if range_file:
-            print("Add quantize tensor range")
+            logger.info("Add quantize tensor range")
             with open(range_file) as f:
                 for line in f:
                     tensor_name, minmax = line.split("@@")[:2]
@@ -1847,11 +2011,11 @@ class Transformer(base_converter.ConverterInterface):
         if not self._option.quantize:
             return False
 
-        print("Add default quantize info for input")
+        logger.info("Add default quantize info for input")
         for i, input_node in enumerate(self._option.input_nodes.values()):
             if input_node.name not in self._quantize_activation_info:
-                print("Input range %s: %s" % (input_node.name,
-                                              str(input_node.range)))
+                logger.info("Input range %s: %s",
+                            input_node.name, input_node.range)
                 new_input_name = self.input_name_map[input_node.name]
                 scale, zero, minval, maxval = \
                     quantize_util.adjust_range(input_node.range[0],
@@ -1868,7 +2032,7 @@ class Transformer(base_converter.ConverterInterface):
                 input_op = self._producer[input_node.name]
                 input_op.quantize_info.extend([quantize_info])
 
-        print("Add default quantize info for ops like Pooling, Softmax")
+        logger.info("Add default quantize info for ops like Pooling, Softmax")
         for op in self._model.op:
             if op.type in [MaceOp.Pooling.name,
                            MaceOp.Reduce.name,
@@ -1952,7 +2116,7 @@ class Transformer(base_converter.ConverterInterface):
         if not self._option.quantize:
             return False
 
-        print("Check quantize info")
+        logger.info("Check quantize info")
         for op in self._model.op:
             if (op.name.find(MaceKeyword.mace_input_node_name) == -1
                 and op.name.find(MaceKeyword.mace_output_node_name) == -1
@@ -1961,12 +2125,14 @@ class Transformer(base_converter.ConverterInterface):
                 mace_check(len(op.output) == len(op.quantize_info),
                            "missing quantize info: %s" % op)
             for i in six.moves.range(len(op.quantize_info)):
-                print("Op output %s range: [%f, %f]" % (
-                    op.output[i],
-                    op.quantize_info[i].minval,
-                    op.quantize_info[i].maxval))
+                logger.info("Op output %s range: [%f, %f]",
+                            op.output[i], op.quantize_info[i].minval,
+                            op.quantize_info[i].maxval)
 
     def fp16_gather_weight(self):
+        # weights halved by this pass, a weight shared by several gathers
+        # is converted once while every gather is rewritten to read fp16
+        halved_weights = set()
         for op in self._model.op:
             if op.type != MaceOp.Gather.name:
                 continue
@@ -1974,11 +2140,15 @@ class Transformer(base_converter.ConverterInterface):
                 raise KeyError("Not in const tensor: " + str(op.input[0]))
 
             const_tensor = self._consts[op.input[0]]
-            if const_tensor.data_type == mace_pb2.DT_FLOAT16:
-                print(str(const_tensor.name) + " is alreay float16")
+            if const_tensor.name in halved_weights:
+                logger.info("FP16 Embedding Lookup Weights: %s (shared)",
+                            const_tensor.name)
+            elif const_tensor.data_type == mace_pb2.DT_FLOAT16:
+                logger.info("%s is alreay float16", const_tensor.name)
                 continue
-
-            print("FP16 Embedding Lookup Weights: %s" % const_tensor.name)
+            else:
+                logger.info("FP16 Embedding Lookup Weights: %s",
+                            const_tensor.name)
 
             op_outputs = [x for x in op.output]
             new_gather_name = op.name + '_fp16'
@@ -1987,6 +2157,7 @@ class Transformer(base_converter.ConverterInterface):
 
             # fp16 weights
             const_tensor.data_type = mace_pb2.DT_FLOAT16
+            halved_weights.add(const_tensor.name)
 
             # change gather
             op.name = new_gather_name
@@ -2011,10 +2182,10 @@ class Transformer(base_converter.ConverterInterface):
             data_type_arg.i = mace_pb2.DT_FLOAT16
 
     def fp16_matmul_weight(self):
-        if self._option.device != DeviceType.CPU.value:
+        if not self._is_cpu:
             return
 
-        print('Convert matmul weights to fp16 for specific matmul: activation + weights')  # noqa
+        logger.info('Convert matmul weights to fp16 for specific matmul: activation + weights')  # noqa
 
         for op in self._model.op:
             if op.type != MaceOp.MatMul.name:
@@ -2052,7 +2223,7 @@ class Transformer(base_converter.ConverterInterface):
                     continue
                 const_tensor = self._consts[right_tensor]
 
-            print('Convert Matmul Weights to fp16: %s' % op.name)
+            logger.info('Convert Matmul Weights to fp16: %s', op.name)
 
             const_tensor.data_type = mace_pb2.DT_FLOAT16
             data_type_arg = ConverterUtil.get_arg(op, MaceKeyword.mace_op_data_type_str)  # noqa
@@ -2063,7 +2234,7 @@ class Transformer(base_converter.ConverterInterface):
             op.output_type.extend([mace_pb2.DT_FLOAT])
 
     def add_opencl_informations(self):
-        print("Add OpenCL informations")
+        logger.info("Add OpenCL informations")
 
         net = self._model
 
@@ -2080,7 +2251,7 @@ class Transformer(base_converter.ConverterInterface):
             dim_arg = ConverterUtil.get_arg(op, MaceKeyword.mace_dim_str)
             shape_tensor = None
             if len(op.input) == 1:
-                print("Transform Caffe Reshape")
+                logger.info("Transform Caffe Reshape")
                 dims = []
                 axis_arg = ConverterUtil.get_arg(op, MaceKeyword.mace_axis_str)
                 # transform caffe reshape op
@@ -2148,7 +2319,7 @@ class Transformer(base_converter.ConverterInterface):
                             len(reshape_op) == 1 and
                             reshape_op[0].type == MaceOp.Reshape.name and
                             len(reshape_op[0].output_shape[0].dims) == 4):
-                        print("Transform channel shuffle")
+                        logger.info("Transform channel shuffle")
                         output_shape = reshape_op[0].output_shape[0].dims
                         self.safe_remove_node(reshape_op[0], op,
                                               remove_input_tensor=True)
@@ -2169,7 +2340,8 @@ class Transformer(base_converter.ConverterInterface):
                         if producer_op.type == MaceOp.Reshape.name:
                             self.safe_remove_node(producer_op, None)
                         elif producer_op.type == MaceOp.Stack.name:
-                            print("Change channel shuffle stack to concat")
+                            logger.info(
+                                "Change channel shuffle stack to concat")
                             # Change previous Stack op to Concat if any
                             producer_op.type = MaceOp.Concat.name
                             producer_op.output_shape[0].dims[:] = output_shape
@@ -2213,10 +2385,9 @@ class Transformer(base_converter.ConverterInterface):
             if not should_quantize:
                 continue
             else:
-                print("Quantize op %s (%s)" % (op.name, op.type))
+                logger.info("Quantize op %s (%s)", op.name, op.type)
 
-            non_zero = self._option.device == DeviceType.CPU.value \
-                and op.type == MaceOp.MatMul.name
+            non_zero = self._is_cpu and op.type == MaceOp.MatMul.name
 
             for idx, input_tensor in enumerate(op.input):
                 quantized_inputs_names.append(input_tensor)
@@ -0,0 +1,219 @@
+# Copyright 2019 The MACE Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+
+from py_proto import mace_pb2
+from transform import base_converter as cvt
+from transform.base_converter import DataFormat
+from transform.base_converter import MaceKeyword
+from transform.base_converter import MaceOp
+from transform.transformer import Transformer
+
+
+class TestRemoveIdentityOp(unittest.TestCase):
+    @staticmethod
+    def add_transpose(net, name, input_name, output_name, dims):
+        op = net.op.add()
+        op.name = name
+        op.type = MaceOp.Transpose.name
+        op.input.append(input_name)
+        op.output.append(output_name)
+        op.output_shape.add().dims.extend([1, 2, 3, 4])
+        op.arg.add(name=MaceKeyword.mace_dims_str, ints=dims)
+        return op
+
+    @staticmethod
+    def add_activation(net, name, input_name, output_name):
+        op = net.op.add()
+        op.name = name
+        op.type = MaceOp.Activation.name
+        op.input.append(input_name)
+        op.output.append(output_name)
+        op.output_shape.add().dims.extend([1, 2, 3, 4])
+        return op
+
+    @staticmethod
+    def transform(net):
+        option = cvt.ConverterOption()
+        input_node = cvt.NodeInfo()
+        input_node.name = 'x'
+        input_node.shape = [1, 2, 3, 4]
+        option.add_input_node(input_node)
+        output_node = cvt.NodeInfo()
+        output_node.name = 'y'
+        option.add_output_node(output_node)
+        option.transformer_option = ['REMOVE_IDENTITY_OP']
+        option.build()
+        Transformer(option, net).run()
+
+    @staticmethod
+    def get_dims(op):
+        return list(cvt.ConverterUtil.get_arg(
+            op, MaceKeyword.mace_dims_str).ints)
+
+    def test_merge_transposes(self):
+        net = mace_pb2.NetDef()
+        self.add_transpose(net, 't0', 'x', 't0_out', [0, 2, 3, 1])
+        self.add_transpose(net, 't1', 't0_out', 't1_out', [0, 2, 3, 1])
+        self.add_activation(net, 'act', 't1_out', 'y')
+        self.transform(net)
+
+        self.assertEqual([op.name for op in net.op], ['t1', 'act'])
+        self.assertEqual(list(net.op[0].input), ['x'])
+        self.assertEqual(self.get_dims(net.op[0]), [0, 3, 1, 2])
+        self.assertEqual(list(net.op[1].input), ['t1_out'])
+
+    def test_remove_transpose_round_trip(self):
+        net = mace_pb2.NetDef()
+        self.add_transpose(net, 't0', 'x', 't0_out', [0, 3, 1, 2])
+        self.add_transpose(net, 't1', 't0_out', 't1_out', [0, 2, 3, 1])
+        self.add_activation(net, 'act', 't1_out', 'y')
+        self.transform(net)
+
+        self.assertEqual([op.name for op in net.op], ['act'])
+        self.assertEqual(list(net.op[0].input), ['x'])
+
+    def test_keep_output_transpose_round_trip(self):
+        net = mace_pb2.NetDef()
+        self.add_transpose(net, 't0', 'x', 't0_out', [0, 3, 1, 2])
+        self.add_transpose(net, 't1', 't0_out', 'y', [0, 2, 3, 1])
+        self.transform(net)
+
+        # the graph input has no real producer to take over the output
+        # name, so the collapsed identity transpose stays in place
+        self.assertEqual([op.name for op in net.op], ['t1'])
+        self.assertEqual(list(net.op[0].input), ['x'])
+        self.assertEqual(list(net.op[0].output), ['y'])
+        self.assertEqual(self.get_dims(net.op[0]), [0, 1, 2, 3])
+
+
+class TestFoldFcAndBn(unittest.TestCase):
+    scale = np.array([0.5, 2.0, -1.0], dtype=np.float32)
+    offset = np.array([0.1, -0.2, 0.3], dtype=np.float32)
+
+    @staticmethod
+    def add_tensor(net, name, data):
+        tensor = net.tensors.add()
+        tensor.name = name
+        tensor.dims.extend(data.shape)
+        tensor.data_type = mace_pb2.DT_FLOAT
+        tensor.float_data.extend(data.ravel().tolist())
+        return tensor
+
+    @staticmethod
+    def add_op(net, name, op_type, inputs, output_name):
+        op = net.op.add()
+        op.name = name
+        op.type = op_type
+        op.input.extend(inputs)
+        op.output.append(output_name)
+        op.output_shape.add().dims.extend([1, 1, 1, 3])
+        return op
+
+    def build_net(self, filter_format, weight, bias=None):
+        net = mace_pb2.NetDef()
+        cvt.ConverterUtil.set_filter_format(net, filter_format)
+        self.add_tensor(net, 'weight', weight)
+        self.add_tensor(net, 'scale', self.scale)
+        self.add_tensor(net, 'offset', self.offset)
+        fc_inputs = ['x', 'weight']
+        if bias is not None:
+            self.add_tensor(net, 'bias', bias)
+            fc_inputs.append('bias')
+        self.add_op(net, 'fc', MaceOp.FullyConnected.name, fc_inputs,
+                    'fc_out')
+        self.add_op(net, 'bn', MaceOp.BatchNorm.name,
+                    ['fc_out', 'scale', 'offset'], 'y')
+        return net
+
+    @staticmethod
+    def transform(net):
+        option = cvt.ConverterOption()
+        input_node = cvt.NodeInfo()
+        input_node.name = 'x'
+        input_node.shape = [1, 1, 1, 4]
+        option.add_input_node(input_node)
+        output_node = cvt.NodeInfo()
+        output_node.name = 'y'
+        option.add_output_node(output_node)
+        option.transformer_option = ['FOLD_FC_AND_BN']
+        option.build()
+        Transformer(option, net).run()
+
+    @staticmethod
+    def get_tensor(net, name):
+        for tensor in net.tensors:
+            if tensor.name == name:
+                return tensor
+        return None
+
+    def get_tensor_data(self, net, name):
+        tensor = self.get_tensor(net, name)
+        return np.array(tensor.float_data,
+                        dtype=np.float32).reshape(tensor.dims)
+
+    def check_bn_removed(self, net):
+        self.assertEqual([op.name for op in net.op], ['fc'])
+        self.assertEqual(list(net.op[0].output), ['y'])
+        self.assertIsNone(self.get_tensor(net, 'scale'))
+
+    def test_fold_oihw_with_bias(self):
+        weight = np.arange(12, dtype=np.float32).reshape(3, 4)
+        bias = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+        net = self.build_net(DataFormat.OIHW, weight, bias)
+        self.transform(net)
+
+        self.check_bn_removed(net)
+        self.assertEqual(list(net.op[0].input), ['x', 'weight', 'bias'])
+        self.assertIsNone(self.get_tensor(net, 'offset'))
+        np.testing.assert_allclose(self.get_tensor_data(net, 'weight'),
+                                   weight * self.scale[:, np.newaxis],
+                                   rtol=1e-6)
+        np.testing.assert_allclose(self.get_tensor_data(net, 'bias'),
+                                   bias * self.scale + self.offset,
+                                   rtol=1e-6)
+
+    def test_fold_oihw_without_bias(self):
+        weight = np.arange(12, dtype=np.float32).reshape(3, 4)
+        net = self.build_net(DataFormat.OIHW, weight)
+        self.transform(net)
+
+        self.check_bn_removed(net)
+        self.assertEqual(list(net.op[0].input), ['x', 'weight', 'offset'])
+        np.testing.assert_allclose(self.get_tensor_data(net, 'weight'),
+                                   weight * self.scale[:, np.newaxis],
+                                   rtol=1e-6)
+        np.testing.assert_allclose(self.get_tensor_data(net, 'offset'),
+                                   self.offset, rtol=1e-6)
+
+    def test_fold_hwio(self):
+        # output channel is the last axis of a HWIO weight
+        weight = np.arange(12, dtype=np.float32).reshape(1, 1, 4, 3)
+        bias = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+        net = self.build_net(DataFormat.HWIO, weight, bias)
+        self.transform(net)
+
+        self.check_bn_removed(net)
+        np.testing.assert_allclose(self.get_tensor_data(net, 'weight'),
+                                   weight * self.scale, rtol=1e-6)
+        np.testing.assert_allclose(self.get_tensor_data(net, 'bias'),
+                                   bias * self.scale + self.offset,
+                                   rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -96,6 +96,11 @@ G[8] = np.array([
 ]).astype(np.float32)
 G_T[8] = np.transpose(G[8])
 
+# the transform matrices are shared by every call, keep them read-only
+for matrices in [A_T, A, B_T, B, G, G_T]:
+    for matrix in matrices.values():
+        matrix.flags.writeable = False
+
 
 def output_shape(input_shape, filter_shape):
     out_shape = np.zeros(4).astype(np.int32)
@@ -116,14 +121,9 @@ def winograd_conv(m, r, input, filter):
 
     K = filter_shape[0]
     C = input_shape[1]
-    U = np.zeros((K * alpha_square, C))
-
-    for k in range(K):
-        for c in range(C):
-            u = np.dot(np.dot(G[alpha], filter[k, c, :, :]), G_T[alpha])
-            for i in range(alpha):
-                for j in range(alpha):
-                    U[(i * alpha + j) * K + k, c] = u[i, j]
+    # U[(i * alpha + j) * K + k, c] = (G * filter[k, c] * G_T)[i, j]
+    U = np.einsum('ib,kcbd,jd->ijkc', G[alpha], filter, G[alpha],
+                  optimize=True).reshape(alpha_square * K, C)
 
     print 'filter out: ', U.shape
 